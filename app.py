@@ -1,9 +1,20 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
+import os
 from io import BytesIO
 from datetime import date, timedelta
 
+from src.analyzer import AssessmentAnalyzer
+from src.cache import ResultCache
+from src.categories import CategoryBucketer
+from src.date_index import DueDateIndex
+from src.diagnostics import StreamlitDiagnostics
+from src.exports import start_report_zip_export
+from src.parallel import parse_sheets_parallel
+from src.profiling import NULL_PROFILER, Profiler
+
 # --- Configuration and Setup ---
 st.set_page_config(
     page_title="أي إنجاز - محلل تقييمات الطلاب",
@@ -52,22 +63,63 @@ ARABIC_TEXT = {
     "export_excel": "تصدير التقرير إلى Excel",
     "no_data_message": "يرجى تحميل ملف Excel للبدء بالتحليل.",
     "no_assessments_in_range": "لا توجد تقييمات مستحقة في نطاق التاريخ المحدد.",
+    "bulk_export_title": "تصدير تقارير الطلاب",
+    "bulk_export_button": "إنشاء ملف ZIP لتقارير جميع الطلاب",
+    "bulk_export_running": "جارٍ إنشاء التقارير...",
+    "bulk_export_refresh": "تحديث الحالة",
+    "bulk_export_download": "تحميل تقارير الطلاب (ZIP)",
+    "bulk_export_failed": "تعذر إنشاء ملف التقارير",
+    "bulk_export_empty": "لم يتم العثور على بيانات طلاب لإنشاء التقارير. تأكد من وجود أسماء التقييمات في الصف 1 بدءاً من العمود H.",
+    "profile_toggle": "عرض تقرير الأداء (للتشخيص)",
+    "profile_trace_memory": "قياس الذاكرة (يبطئ المعالجة)",
+    "profile_title": "⏱️ تقرير الأداء لهذا التشغيل",
+    "profile_total": "إجمالي زمن المراحل",
+    "profile_stages": "المراحل",
+    "profile_sheets": "حسب ورقة العمل",
+    "profile_cached": "تم استخدام النتائج المخزنة مؤقتاً، لذلك لم تُسجَّل مراحل المعالجة.",
+    "profile_download": "تحميل تقرير الأداء (JSON)",
     "overall_column": "Overall",
     "due_date_row": 1 # 0-indexed row for due dates (row 2 in Excel)
 }
 
+# Category thresholds on the 'Overall' percentage, sorted once
+OVERALL_CATEGORIES = CategoryBucketer(
+    {
+        ARABIC_TEXT["platinum"]: 95,
+        ARABIC_TEXT["gold"]: 85,
+        ARABIC_TEXT["silver"]: 75,
+        ARABIC_TEXT["bronze"]: 65,
+    },
+    default=ARABIC_TEXT["needs_improvement"]
+)
+
 # --- Data Processing Functions ---
 
-@st.cache_data
-def process_excel_file(uploaded_file):
+# persist="disk" keeps processed uploads across app restarts
+@st.cache_data(persist="disk")
+def process_excel_file(uploaded_file, workers=1, _profiler=None):
     """
     Reads the Excel file, processes each sheet, and returns a combined DataFrame
     and a summary DataFrame.
+
+    With workers > 1 the sheets are parsed in a process pool; results are still
+    combined in workbook sheet order.
+
+    _profiler (a src.profiling.Profiler) records the processing stages; the
+    leading underscore keeps it out of the cache key, so nothing is recorded
+    when the result comes from the cache.
     """
-    xls = pd.ExcelFile(uploaded_file)
+    profiler = _profiler if _profiler is not None else NULL_PROFILER
+    with profiler.stage("open_workbook"):
+        xls = pd.ExcelFile(uploaded_file)
     all_data = []
     summary_data = []
 
+    parsed_sheets = None
+    if workers > 1 and len(xls.sheet_names) > 1:
+        with profiler.stage("parse_sheets_parallel"):
+            parsed_sheets = parse_sheets_parallel(uploaded_file, xls.sheet_names, workers)
+
     for sheet_name in xls.sheet_names:
         # Extract Grade and Section from sheet name (e.g., "الصف ثالث1")
         # Assuming the format is "الصف [Grade][Section]"
@@ -82,31 +134,44 @@ def process_excel_file(uploaded_file):
 
         try:
             # Read the sheet, skipping the first row (header) to get to the due dates
-            df = xls.parse(sheet_name, header=None)
+            with profiler.stage("read_sheet", sheet=sheet_name) as stage:
+                if parsed_sheets is not None:
+                    df = parsed_sheets.pop(sheet_name)
+                    if isinstance(df, Exception):
+                        raise df
+                else:
+                    df = xls.parse(sheet_name, header=None)
+                stage.count(rows=len(df), cells=df.size)
 
-            # Due dates are in the second row (index 1)
-            due_dates = df.iloc[ARABIC_TEXT["due_date_row"]].copy()
-            
-            # The actual data starts from the third row (index 2)
-            df.columns = df.iloc[2]
-            df = df[3:].reset_index(drop=True)
-            
-            # Clean column names (remove NaN and convert to string)
-            df.columns = [str(col) for col in df.columns]
+            with profiler.stage("prepare_sheet", sheet=sheet_name) as stage:
+                # Due dates are in the second row (index 1)
+                due_dates = df.iloc[ARABIC_TEXT["due_date_row"]].copy()
+                
+                # The actual data starts from the third row (index 2)
+                df.columns = df.iloc[2]
+                df = df[3:].reset_index(drop=True)
+                
+                # Clean column names (remove NaN and convert to string)
+                df.columns = [str(col) for col in df.columns]
+
+                # Find the 'Overall' column (index 5, 0-indexed)
+                overall_col_name = df.columns[5]
 
-            # Find the 'Overall' column (index 5, 0-indexed)
-            overall_col_name = df.columns[5]
-            df[overall_col_name] = pd.to_numeric(df[overall_col_name], errors='coerce')
+                # Convert 'Overall' and the assessment columns to numbers once here,
+                # so date filtering never has to re-parse them
+                numeric_part = df.iloc[:, 5:].apply(pd.to_numeric, errors='coerce').astype('float64')
+                df = pd.concat([df.iloc[:, :5], numeric_part], axis=1)
+
+                # Prepare assessment columns and due dates (keyed by assessment name)
+                assessment_cols = df.columns[6:]
+                assessment_due_dates = pd.Series(due_dates.iloc[6:].to_numpy(), index=assessment_cols)
+                stage.count(rows=len(df), cells=numeric_part.size)
 
             # Add Grade and Section columns
             df[ARABIC_TEXT["grade"]] = grade
             df[ARABIC_TEXT["section"]] = section
             df["Sheet_Name"] = sheet_name
             
-            # Prepare assessment columns and due dates
-            assessment_cols = df.columns[6:]
-            assessment_due_dates = due_dates.iloc[6:]
-            
             # Store data for later use
             all_data.append(df)
 
@@ -132,7 +197,14 @@ def process_excel_file(uploaded_file):
     if not all_data:
         return None, None, None
 
-    combined_df = pd.concat(all_data, ignore_index=True)
+    with profiler.stage("combine_sheets") as stage:
+        combined_df = pd.concat(all_data, ignore_index=True)
+
+        # Grade, section and sheet repeat for every student, so store them as categoricals
+        for col in [ARABIC_TEXT["grade"], ARABIC_TEXT["section"], "Sheet_Name"]:
+            combined_df[col] = combined_df[col].astype("category")
+        stage.count(rows=len(combined_df), cells=combined_df.size)
+
     summary_df = pd.DataFrame(summary_data)
     
     # Extract all unique due dates and assessment names
@@ -141,31 +213,62 @@ def process_excel_file(uploaded_file):
         all_due_dates.update(item["Assessment_Due_Dates"])
     
     # Convert due dates to datetime objects
-    for key, value in all_due_dates.items():
-        try:
-            # Attempt to parse as date, handle NaT/None
-            if pd.notna(value):
-                all_due_dates[key] = pd.to_datetime(value).date()
-            else:
-                all_due_dates[key] = None
-        except:
-            all_due_dates[key] = None # Fallback for unparseable dates
+    with profiler.stage("parse_due_dates", cells=len(all_due_dates)):
+        for key, value in all_due_dates.items():
+            try:
+                # Attempt to parse as date, handle NaT/None
+                if pd.notna(value):
+                    all_due_dates[key] = pd.to_datetime(value).date()
+                else:
+                    all_due_dates[key] = None
+            except:
+                all_due_dates[key] = None # Fallback for unparseable dates
 
     return combined_df, summary_df, all_due_dates
 
-def filter_data_by_date(df, all_due_dates, start_date, end_date):
+@st.cache_data(persist="disk")
+def build_due_date_index(uploaded_file, workers=1):
+    """
+    Builds the due-date prefix-sum index for an uploaded file once, so date
+    filter changes only run binary searches over it.
+    """
+    combined_df, _, all_due_dates = process_excel_file(uploaded_file, workers=workers)
+    if combined_df is None:
+        return None
+    return DueDateIndex(all_due_dates, combined_df)
+
+def analyze_student_reports(uploaded_file, workers=1, profiler=NULL_PROFILER):
+    """
+    Runs AssessmentAnalyzer over every sheet of the uploaded file and returns
+    one row per student and subject, as used by the per-student reports.
+
+    Records are kept in the size-limited on-disk ResultCache, so the same
+    file is not scored again.
+    """
+    xls = pd.ExcelFile(uploaded_file)
+    analyzer = AssessmentAnalyzer(diagnostics=StreamlitDiagnostics(), profiler=profiler)
+    records = analyzer.analyze_file(uploaded_file, xls.sheet_names, workers=workers, cache=ResultCache())
+    return pd.DataFrame(records)
+
+def filter_data_by_date(df, all_due_dates, start_date, end_date, date_index=None, profiler=NULL_PROFILER):
     """
     Filters the combined DataFrame to only include assessments with due dates
     within the specified range.
+
+    date_index is the DueDateIndex of df; it is built on the fly when omitted.
+    profiler (a src.profiling.Profiler) records the filtering stages.
     """
     if df is None:
         return None, None
 
-    # Identify assessment columns that fall within the date range
-    valid_assessment_cols = []
-    for col_name, due_date in all_due_dates.items():
-        if due_date and start_date <= due_date <= end_date:
-            valid_assessment_cols.append(col_name)
+    if date_index is None:
+        with profiler.stage("build_date_index", rows=len(df)):
+            date_index = DueDateIndex(all_due_dates, df)
+
+    # Identify assessment columns that fall within the date range, in the
+    # sheet's column order (the index returns them sorted by due date)
+    column_order = {col: position for position, col in enumerate(all_due_dates)}
+    valid_assessment_cols = sorted(date_index.columns(start_date, end_date), key=column_order.__getitem__)
 
     if not valid_assessment_cols:
         return None, None
@@ -189,60 +292,81 @@ def filter_data_by_date(df, all_due_dates, start_date, end_date):
     # This is a simplified calculation: average of the percentages in the valid columns
     # Note: The user explicitly requested to keep the system's 'Overall' column for the main summary.
     # This new calculation is only for the new features (Top 3, Section Report).
-    
-    df_filtered = df.copy()
-    
-    # Convert valid assessment columns to numeric, coercing errors to NaN
-    for col in valid_assessment_cols:
-        df_filtered[col] = pd.to_numeric(df_filtered[col], errors='coerce')
-        
+
+    # Assessment columns are already numeric (see process_excel_file), so the
+    # result only carries the student columns instead of a copy of the whole frame
+    info_cols = [col for col in df.columns if col not in all_due_dates]
+    df_filtered = df[info_cols].copy()
+
     # Calculate the average percentage across the valid assessments for each student
-    df_filtered['Filtered_Achievement'] = df_filtered[valid_assessment_cols].mean(axis=1)
-    
-    # Calculate the achievement rate per subject and section
-    section_achievement_report = []
-    for subject, cols in subject_cols.items():
-        # Calculate the average percentage across the subject's valid assessments for each student
-        df_filtered[f'Subject_Achievement_{subject}'] = df_filtered[cols].mean(axis=1)
-        
-        # Group by section and calculate the average achievement for the subject
-        subject_group = df_filtered.groupby([ARABIC_TEXT["grade"], ARABIC_TEXT["section"]])[f'Subject_Achievement_{subject}'].mean().reset_index()
-        subject_group.rename(columns={f'Subject_Achievement_{subject}': ARABIC_TEXT["achievement_rate"]}, inplace=True)
-        subject_group[ARABIC_TEXT["subject"]] = subject
-        
-        section_achievement_report.append(subject_group)
+    with profiler.stage("window_mean", rows=len(df), cells=len(df) * len(valid_assessment_cols)):
+        df_filtered['Filtered_Achievement'] = date_index.window_mean(start_date, end_date)
 
-    if section_achievement_report:
-        section_achievement_df = pd.concat(section_achievement_report, ignore_index=True)
-        section_achievement_df[ARABIC_TEXT["achievement_rate"]] = section_achievement_df[ARABIC_TEXT["achievement_rate"]].fillna(0).round(2)
-    else:
-        section_achievement_df = pd.DataFrame()
+    # Calculate the achievement rate per subject and section
+    with profiler.stage("section_achievement", rows=len(df), cells=len(df) * len(valid_assessment_cols)):
+        section_achievement_df = subject_section_achievement(df, subject_cols)
 
     return df_filtered, section_achievement_df
 
+def subject_section_achievement(df, subject_cols):
+    """
+    Calculates the achievement rate of every subject in every grade/section.
+
+    The assessment values are melted into one long (student, subject, value)
+    table, so all subjects are averaged in the same grouped pass: first per
+    student and subject, then per grade, section and subject. Sections with
+    no values for a subject get 0.
+    """
+    grade_col, section_col, subject_col = ARABIC_TEXT["grade"], ARABIC_TEXT["section"], ARABIC_TEXT["subject"]
+    subjects = list(subject_cols)
+    if not subjects:
+        return pd.DataFrame()
+
+    # Column positions rather than labels, so a repeated title keeps all its columns
+    positions = [df.columns.get_indexer_for(cols) for cols in subject_cols.values()]
+    col_subjects = np.repeat(np.arange(len(subjects)), [len(subject_positions) for subject_positions in positions])
+
+    # Long format: one row per numeric student × assessment cell
+    values = df.iloc[:, np.concatenate(positions)].to_numpy(dtype=float)
+    rows, positions = np.nonzero(~np.isnan(values))
+    long_df = pd.DataFrame({
+        grade_col: df[grade_col].to_numpy()[rows],
+        section_col: df[section_col].to_numpy()[rows],
+        "student": rows,
+        subject_col: pd.Categorical.from_codes(col_subjects[positions], categories=subjects),
+        "value": values[rows, positions],
+    })
+
+    # Student averages per subject, then section averages of those
+    student_means = long_df.groupby([grade_col, section_col, subject_col, "student"], observed=True, sort=False)["value"].mean()
+    section_means = student_means.groupby(level=[subject_col, grade_col, section_col], observed=True).mean()
+
+    # Every subject is reported for every grade/section present in the file
+    sections = df.groupby([grade_col, section_col], observed=True).size().index
+    report_index = pd.MultiIndex.from_tuples(
+        [(subject, grade, section) for subject in subjects for grade, section in sections],
+        names=[subject_col, grade_col, section_col]
+    )
+    section_achievement_df = (
+        section_means.reindex(report_index)
+        .fillna(0)
+        .round(2)
+        .rename(ARABIC_TEXT["achievement_rate"])
+        .reset_index()
+    )
+    # Plain strings, so callers sort and group subjects alphabetically, not by category order
+    section_achievement_df[subject_col] = section_achievement_df[subject_col].astype(object)
+    return section_achievement_df[[grade_col, section_col, ARABIC_TEXT["achievement_rate"], subject_col]]
+
+
 def categorize_students(df):
     """Categorizes students based on their 'Overall' achievement percentage."""
     if df is None or ARABIC_TEXT["overall_column"] not in df.columns:
         return pd.DataFrame()
 
-    def get_category(percentage):
-        if percentage >= 95:
-            return ARABIC_TEXT["platinum"]
-        elif percentage >= 85:
-            return ARABIC_TEXT["gold"]
-        elif percentage >= 75:
-            return ARABIC_TEXT["silver"]
-        elif percentage >= 65:
-            return ARABIC_TEXT["bronze"]
-        else:
-            return ARABIC_TEXT["needs_improvement"]
-
-    df[ARABIC_TEXT["category"]] = df[ARABIC_TEXT["overall_column"]].apply(get_category)
+    df[ARABIC_TEXT["category"]] = OVERALL_CATEGORIES.assign(df[ARABIC_TEXT["overall_column"]].to_numpy(dtype=float))
     
-    category_order = [
-        ARABIC_TEXT["platinum"], ARABIC_TEXT["gold"], ARABIC_TEXT["silver"],
-        ARABIC_TEXT["bronze"], ARABIC_TEXT["needs_improvement"]
-    ]
+    category_order = OVERALL_CATEGORIES.categories()
     
     category_counts = df.groupby(ARABIC_TEXT["category"]).size().reset_index(name='Count')
     category_counts[ARABIC_TEXT["category"]] = pd.Categorical(
@@ -269,6 +393,35 @@ def get_top_sections(section_achievement_df, top_n=3):
     
     return top_sections[[ARABIC_TEXT["subject"], ARABIC_TEXT["rank"], ARABIC_TEXT["grade"], ARABIC_TEXT["section"], ARABIC_TEXT["achievement_rate"]]]
 
+def show_profile_report(profiler):
+    """Debug panel with the time, rows/cells and peak memory of every stage of this run."""
+    report = profiler.report()
+    with st.expander(ARABIC_TEXT["profile_title"], expanded=True):
+        if not any(stage["depth"] > 0 for stage in report["records"]):
+            st.info(ARABIC_TEXT["profile_cached"])
+        st.metric(ARABIC_TEXT["profile_total"], f"{report['total_seconds']:.2f} s")
+
+        columns = ["name", "calls", "seconds", "rows", "cells", "peak_mb"]
+        stages_df = pd.DataFrame(report["stages"])
+        if not stages_df.empty:
+            stages_df["name"] = ["\u00a0\u00a0" * depth + name for depth, name in zip(stages_df["depth"], stages_df["name"])]
+            stages_df["peak_mb"] = stages_df["peak_bytes"].astype(float) / 1e6
+            st.subheader(ARABIC_TEXT["profile_stages"])
+            st.dataframe(stages_df[columns], hide_index=True, use_container_width=True)
+
+        sheets_df = pd.DataFrame(report["sheets"])
+        if not sheets_df.empty:
+            sheets_df["peak_mb"] = sheets_df["peak_bytes"].astype(float) / 1e6
+            st.subheader(ARABIC_TEXT["profile_sheets"])
+            st.dataframe(sheets_df[["sheet"] + columns], hide_index=True, use_container_width=True)
+
+        st.download_button(
+            label=ARABIC_TEXT["profile_download"],
+            data=profiler.to_json(),
+            file_name="run_profile.json",
+            mime="application/json"
+        )
+
 def to_excel(df):
     """Converts a DataFrame to an Excel file in memory."""
     output = BytesIO()
@@ -310,7 +463,24 @@ def load_teacher_mapping(file):
         return None
 
 if uploaded_file:
-    combined_df, summary_df, all_due_dates = process_excel_file(uploaded_file)
+    with st.sidebar.expander("إعدادات الأداء"):
+        workers = st.number_input(
+            "عدد العمليات المتوازية لمعالجة الأوراق",
+            min_value=1,
+            max_value=os.cpu_count() or 1,
+            value=1,
+            help="القيمة 1 تعالج الأوراق بالتتابع؛ القيم الأكبر تعالجها على عدة أنوية."
+        )
+        show_profile = st.checkbox(ARABIC_TEXT["profile_toggle"])
+        trace_memory = st.checkbox(ARABIC_TEXT["profile_trace_memory"], disabled=not show_profile)
+
+    # Stage timings of this run, shown at the end of the page
+    profiler = Profiler(trace_memory=trace_memory) if show_profile else NULL_PROFILER
+
+    with profiler.stage("process_excel_file"):
+        combined_df, summary_df, all_due_dates = process_excel_file(
+            uploaded_file, workers=int(workers), _profiler=profiler
+        )
 
     if combined_df is not None:
         
@@ -345,7 +515,13 @@ if uploaded_file:
                 st.stop()
                 
             # Filter data based on the selected date range
-            filtered_df, section_achievement_df = filter_data_by_date(combined_df, all_due_dates, start_date, end_date)
+            with profiler.stage("build_due_date_index"):
+                date_index = build_due_date_index(uploaded_file, workers=int(workers))
+            with profiler.stage("filter_data_by_date"):
+                filtered_df, section_achievement_df = filter_data_by_date(
+                    combined_df, all_due_dates, start_date, end_date,
+                    date_index=date_index, profiler=profiler
+                )
             
             if filtered_df is None:
                 st.warning(ARABIC_TEXT["no_assessments_in_range"])
@@ -573,6 +749,41 @@ if uploaded_file:
                 else:
                     st.warning("لم يتم العثور على بيانات معلمين متطابقة مع بيانات الإنجاز. يرجى التأكد من تطابق أسماء المواد والصفوف والشعب في كلا الملفين.")
 
+        # 8. Bulk export of per-student reports
+        st.header(ARABIC_TEXT["bulk_export_title"])
+        export_job = st.session_state.get("report_export")
+
+        if st.button(ARABIC_TEXT["bulk_export_button"]):
+            # Replace the previous archive, stopping its export if still running
+            if export_job is not None:
+                export_job.cleanup()
+            with profiler.stage("analyze_student_reports"):
+                student_reports_df = analyze_student_reports(uploaded_file, workers=int(workers), profiler=profiler)
+            if student_reports_df.empty:
+                st.warning(ARABIC_TEXT["bulk_export_empty"])
+                export_job = None
+            else:
+                export_job = start_report_zip_export(student_reports_df)
+            st.session_state["report_export"] = export_job
+
+        if export_job is not None:
+            if not export_job.done:
+                st.progress(export_job.progress, text=ARABIC_TEXT["bulk_export_running"])
+                st.button(ARABIC_TEXT["bulk_export_refresh"])
+            elif export_job.error is not None:
+                st.error(f"{ARABIC_TEXT['bulk_export_failed']}: {export_job.error}")
+            else:
+                with export_job.open() as archive:
+                    st.download_button(
+                        label=ARABIC_TEXT["bulk_export_download"],
+                        data=archive,
+                        file_name="student_reports.zip",
+                        mime="application/zip"
+                    )
+
+        if profiler.enabled:
+            show_profile_report(profiler)
+
     else:
         st.error("لم يتم العثور على بيانات صالحة في الملف المحمل.")
 
@@ -0,0 +1,5 @@
+"""
+Performance benchmarks for the analyzer and the app's data functions.
+
+    python -m benchmarks.run --sheets 20 --students 35 --assessments 30
+"""
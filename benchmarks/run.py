@@ -0,0 +1,364 @@
+"""
+Benchmark runner.
+
+Generates synthetic workbooks, times the analyzer, the app's data functions
+and the report generators on them, and saves the timings as JSON so two
+commits can be compared:
+
+    python -m benchmarks.run                      # writes benchmarks/results/<time>-<commit>.json
+    python -m benchmarks.run --compare benchmarks/results/<older>.json --fail-above 1.25
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .workbooks import make_analyzer_workbook, make_app_workbook
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+
+# Due-date window used by the date-filter benchmarks (covers most generated dates)
+DATE_RANGE = (date(2025, 10, 1), date(2026, 1, 31))
+
+# Exit codes
+EXIT_OK = 0
+EXIT_REGRESSION = 1
+
+
+def measure(fn: Callable[[], object], repeat: int, setup: Optional[Callable[[], None]] = None) -> Dict:
+    """Run fn repeat times (calling setup untimed before each run) and summarize the seconds."""
+    runs = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - started)
+    return {
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "max": max(runs),
+        "runs": runs,
+    }
+
+
+def measure_import(module: str, repeat: int) -> Dict:
+    """Time importing module in fresh interpreters."""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        runs.append(float(output.strip().splitlines()[-1]))
+    return {"min": min(runs), "median": statistics.median(runs), "max": max(runs), "runs": runs}
+
+
+def load_app():
+    """
+    Import app.py outside `streamlit run`.
+
+    The page script runs once in Streamlit's bare mode (no file uploaded, so
+    it stops at the upload prompt); its data functions can then be called.
+    """
+    from streamlit import config
+    from streamlit.logger import set_log_level
+
+    # Silence the bare-mode warnings; the option keeps the level when the page configures itself
+    config.set_option("logger.level", "error")
+    set_log_level("error")
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    import app
+    return app
+
+
+def _uncached(function: Callable) -> Callable:
+    """The function behind st.cache_data, so every run does the work."""
+    return getattr(function, "__wrapped__", function)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_ROOT, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{commit}-dirty" if dirty else commit
+
+
+def environment() -> Dict:
+    import numpy
+    import openpyxl
+    import pandas
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "pandas": pandas.__version__,
+        "numpy": numpy.__version__,
+        "openpyxl": openpyxl.__version__,
+    }
+
+
+class BenchmarkSuite:
+    """Builds the workbooks once and runs the selected cases on them."""
+
+    def __init__(self, args: argparse.Namespace, directory: str):
+        self.args = args
+        self.directory = directory
+        self.results: Dict[str, Dict] = {}
+
+        size = dict(sheets=args.sheets, students=args.students, assessments=args.assessments, seed=args.seed)
+        self.analyzer_path = make_analyzer_workbook(os.path.join(directory, "analyzer.xlsx"), **size)
+        self.app_path = make_app_workbook(os.path.join(directory, "app.xlsx"), **size)
+
+    def selected(self, name: str) -> bool:
+        return not self.args.filter or any(pattern in name for pattern in self.args.filter)
+
+    def run_case(self, name: str, fn: Callable[[], Dict], items: Optional[int] = None):
+        """Run one case; a failing case is recorded with its error instead of stopping the suite."""
+        if not self.selected(name):
+            return
+        try:
+            result = fn()
+        except Exception as e:
+            result = {"error": f"{type(e).__name__}: {e}"}
+        if items is not None:
+            result["items"] = items
+        self.results[name] = result
+        self.report(name, result)
+
+    def report(self, name: str, result: Dict):
+        if self.args.quiet:
+            return
+        if "error" in result:
+            line = f"{name:<34} ERROR {result['error']}"
+        else:
+            line = f"{name:<34} median {result['median'] * 1000:9.1f} ms   min {result['min'] * 1000:9.1f} ms"
+            if result.get("items"):
+                line += f"   {result['median'] / result['items'] * 1e6:8.2f} us/item"
+        print(line, file=sys.stderr, flush=True)
+
+    def run(self) -> Dict[str, Dict]:
+        import pandas as pd
+
+        repeat = self.args.repeat
+
+        self.run_case("import_src", lambda: measure_import("src", repeat))
+        self.run_case("import_src_analyzer", lambda: measure_import("src.analyzer", repeat))
+
+        from src import dates
+        from src.analyzer import AssessmentAnalyzer
+        from src.email_reports import SubjectReportGenerator
+        from src.html_reports import HTMLReportRenderer
+
+        xls = pd.ExcelFile(self.analyzer_path)
+        sheets = xls.sheet_names
+        frames = {sheet: xls.parse(sheet, header=None) for sheet in sheets}
+        students = self.args.sheets * self.args.students
+
+        # _parse_date over every due-date cell, with a cold and a warm value cache
+        analyzer = AssessmentAnalyzer()
+        due_cells = [value for frame in frames.values() for value in frame.iloc[2, 7:].tolist()]
+        clear_date_cache = getattr(getattr(dates, "_parse_value_cached", None), "cache_clear", None)
+
+        def parse_all():
+            for value in due_cells:
+                analyzer._parse_date(value)
+
+        self.run_case("parse_date_cold", lambda: measure(parse_all, repeat, setup=clear_date_cache), len(due_cells))
+        self.run_case("parse_date_cached", lambda: measure(parse_all, repeat), len(due_cells))
+
+        # Scoring only: sheets already read into DataFrames
+        def analyze_sheets(date_range=None):
+            sheet_analyzer = AssessmentAnalyzer(date_range=date_range)
+            for sheet, frame in frames.items():
+                sheet_analyzer.analyze_sheet(frame, sheet)
+
+        self.run_case("analyze_sheet", lambda: measure(analyze_sheets, repeat), students)
+        self.run_case("analyze_sheet_date_range", lambda: measure(lambda: analyze_sheets(DATE_RANGE), repeat), students)
+
+        # Whole file: reading plus scoring, on a fresh analyzer so nothing is reused
+        def analyze_file(**options):
+            return AssessmentAnalyzer().analyze_file(self.analyzer_path, sheets, **options)
+
+        self.run_case("analyze_file", lambda: measure(analyze_file, repeat), students)
+        self.run_case("analyze_file_streaming", lambda: measure(lambda: analyze_file(streaming=True), repeat), students)
+        if self.args.workers > 1:
+            self.run_case(
+                f"analyze_file_workers_{self.args.workers}",
+                lambda: measure(lambda: analyze_file(workers=self.args.workers), repeat),
+                students
+            )
+
+        # Report generators on the analyzer results
+        results = pd.DataFrame(analyze_file())
+        self.run_case(
+            "html_reports",
+            lambda: measure(lambda: list(HTMLReportRenderer().render_frame(results)), repeat),
+            len(results)
+        )
+        self.run_case(
+            "section_reports",
+            lambda: measure(lambda: SubjectReportGenerator().generate_section_reports(results), repeat),
+            len(results)
+        )
+        if self.args.pdf:
+            from src.pdf_reports import write_pdf_reports
+
+            def pdf_reports():
+                with tempfile.TemporaryDirectory() as pdf_dir:
+                    write_pdf_reports(results, pdf_dir)
+
+            self.run_case("pdf_reports", lambda: measure(pdf_reports, repeat), len(results))
+
+        # The app's data functions
+        if any(self.selected(name) for name in ("process_excel_file", "filter_data_by_date")):
+            self.run_app_cases(repeat)
+
+        return self.results
+
+    def run_app_cases(self, repeat: int):
+        from src.date_index import DueDateIndex
+
+        try:
+            app = load_app()
+        except ImportError as e:
+            # Streamlit or plotly missing: the analyzer cases still count
+            for name in ("process_excel_file", "filter_data_by_date", "filter_data_by_date_indexed"):
+                self.run_case(name, lambda: {"error": f"app not importable: {e}"})
+            return
+
+        process_excel_file = _uncached(app.process_excel_file)
+
+        combined_df, _, all_due_dates = process_excel_file(self.app_path)
+        rows = len(combined_df)
+
+        self.run_case("process_excel_file", lambda: measure(lambda: process_excel_file(self.app_path), repeat), rows)
+        self.run_case(
+            "filter_data_by_date",
+            lambda: measure(lambda: app.filter_data_by_date(combined_df, all_due_dates, *DATE_RANGE), repeat),
+            rows
+        )
+        date_index = DueDateIndex(all_due_dates, combined_df)
+        self.run_case(
+            "filter_data_by_date_indexed",
+            lambda: measure(
+                lambda: app.filter_data_by_date(combined_df, all_due_dates, *DATE_RANGE, date_index=date_index),
+                repeat
+            ),
+            rows
+        )
+
+
+def compare(old: Dict, new: Dict) -> List[Dict]:
+    """Median ratio new/old for every case present and successful in both runs."""
+    rows = []
+    for name, result in new["results"].items():
+        before = old["results"].get(name)
+        if not before or "error" in before or "error" in result:
+            continue
+        rows.append({
+            "name": name,
+            "old": before["median"],
+            "new": result["median"],
+            "ratio": result["median"] / before["median"] if before["median"] else float("inf"),
+        })
+    return rows
+
+
+def print_comparison(rows: List[Dict], old_label: str, new_label: str):
+    print(f"{'case':<34} {old_label:>12} {new_label:>12}   ratio", file=sys.stderr)
+    for row in rows:
+        print(
+            f"{row['name']:<34} {row['old'] * 1000:9.1f} ms {row['new'] * 1000:9.1f} ms   {row['ratio']:5.2f}x",
+            file=sys.stderr
+        )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="Time the analyzer on synthetic workbooks.")
+    parser.add_argument("--sheets", type=int, default=20, help="Sheets per workbook (default 20)")
+    parser.add_argument("--students", type=int, default=35, help="Students per sheet (default 35)")
+    parser.add_argument("--assessments", type=int, default=30, help="Assessments per sheet (default 30)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed of the generated data")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Timed runs per case (default 5)")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Also time analyze_file with this many processes")
+    parser.add_argument("-k", "--filter", action="append", help="Only run cases whose name contains this text (repeatable)")
+    parser.add_argument("--pdf", action="store_true", help="Also time PDF report generation")
+    parser.add_argument("-o", "--output", help="Result JSON path (default benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", help="Earlier result JSON to compare against")
+    parser.add_argument("--fail-above", type=float, help="Exit with an error if a case's median ratio to --compare exceeds this")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only print the comparison")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.fail_above and not args.compare:
+        parser.error("--fail-above requires --compare")
+
+    # Date-format and bare-mode warnings from the code under test are not benchmark output
+    warnings.filterwarnings("ignore")
+    logging.getLogger("src.analyzer").setLevel(logging.CRITICAL)
+
+    commit = git_commit()
+    started = datetime.now()
+    with tempfile.TemporaryDirectory() as directory:
+        results = BenchmarkSuite(args, directory).run()
+
+    run = {
+        "commit": commit,
+        "started_at": started.isoformat(timespec="seconds"),
+        "environment": environment(),
+        "parameters": {
+            "sheets": args.sheets,
+            "students": args.students,
+            "assessments": args.assessments,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "workers": args.workers,
+        },
+        "results": results,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{started:%Y%m%d-%H%M%S}-{commit or 'unknown'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(run, f, indent=2, ensure_ascii=False)
+    print(f"results: {output}", file=sys.stderr)
+
+    if not args.compare:
+        return EXIT_OK
+
+    with open(args.compare, encoding="utf-8") as f:
+        old = json.load(f)
+    if old.get("parameters") != run["parameters"]:
+        print("warning: the runs used different parameters", file=sys.stderr)
+    rows = compare(old, run)
+    print_comparison(rows, old.get("commit") or "old", commit or "new")
+
+    if args.fail_above and any(row["ratio"] > args.fail_above for row in rows):
+        return EXIT_REGRESSION
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
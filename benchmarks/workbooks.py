@@ -0,0 +1,135 @@
+"""
+Synthetic workbooks for benchmarking.
+
+make_analyzer_workbook() follows the layout AssessmentAnalyzer reads
+(student names in column A from row 5, assessment titles from H1, due dates
+in row 3); make_app_workbook() follows the layout process_excel_file reads
+(due dates in row 2, headers in row 3, "Overall" in column F).
+
+Both are deterministic for a given seed, so results from different commits
+are measured on the same data.
+"""
+
+import random
+from datetime import datetime, timedelta
+from typing import List
+
+from openpyxl import Workbook
+
+SUBJECTS = ["الرياضيات", "العلوم", "اللغة العربية", "اللغة الانجليزية", "التربية الاسلامية"]
+ARABIC_MONTHS = ["يناير", "فبراير", "مارس", "أبريل", "ابريل", "مايو", "سبتمبر", "أكتوبر", "اكتوبر", "نوفمبر", "ديسمبر"]
+ARABIC_DIGITS = str.maketrans("0123456789", "٠١٢٣٤٥٦٧٨٩")
+
+# Cell values of the analyzer layout and how often they occur
+ANALYZER_CELLS = ["M", "M", "m ", "I", "AB", "X", "-", "—", None, None, 80, 95.5, 100, 0, "تم"]
+
+SCHOOL_YEAR_START = datetime(2025, 9, 1)
+
+
+def _due_date_cell(rnd: random.Random, position: int):
+    """A due date in one of the formats found in real exports."""
+    day = SCHOOL_YEAR_START + timedelta(days=rnd.randint(0, 270))
+    kind = position % 6
+    if kind == 0:
+        return day
+    if kind == 1:
+        return f"{day.day} {rnd.choice(ARABIC_MONTHS)}"
+    if kind == 2:
+        return f"{day.day} {rnd.choice(ARABIC_MONTHS)}".translate(ARABIC_DIGITS)
+    if kind == 3:
+        return day.strftime("%d/%m/%Y")
+    if kind == 4:
+        return (day - datetime(1899, 12, 30)).days  # Excel serial number
+    return rnd.choice([day.strftime("%Y-%m-%d"), "-", None])
+
+
+def _assessment_titles(assessments: int) -> List[str]:
+    titles = []
+    for position in range(assessments):
+        if position and position % 15 == 0:
+            titles.append("Overall")  # skipped by the analyzer
+        else:
+            titles.append(f"تقييم أسبوعي {position + 1}")
+    return titles
+
+
+def make_analyzer_workbook(
+    path: str,
+    sheets: int = 20,
+    students: int = 35,
+    assessments: int = 30,
+    seed: int = 1
+) -> str:
+    """
+    Write a workbook in the layout AssessmentAnalyzer expects.
+
+    Args:
+        path: Output .xlsx path
+        sheets: Number of sheets ("المادة المستوى الشعبة")
+        students: Students per sheet
+        assessments: Assessment columns per sheet
+        seed: Random seed
+
+    Returns:
+        path
+    """
+    rnd = random.Random(seed)
+    wb = Workbook(write_only=True)
+    titles = _assessment_titles(assessments)
+    padding = [None] * 6  # columns B-G
+
+    for position in range(sheets):
+        subject = SUBJECTS[position % len(SUBJECTS)]
+        ws = wb.create_sheet(f"{subject} {position // len(SUBJECTS) % 12 + 1:02d} {position + 1}")
+
+        ws.append(["الطالب"] + padding + titles)
+        ws.append([])
+        ws.append([None] + padding + [_due_date_cell(rnd, column) for column in range(assessments)])
+        ws.append([])
+        for student in range(students):
+            # A few rows that are not students, as in real exports
+            name = f"طالب {position + 1}-{student + 1}" if student % 40 != 39 else rnd.choice(["المجموع", None])
+            ws.append([name] + padding + [rnd.choice(ANALYZER_CELLS) for _ in range(assessments)])
+
+    wb.save(path)
+    return path
+
+
+def make_app_workbook(
+    path: str,
+    sheets: int = 20,
+    students: int = 35,
+    assessments: int = 30,
+    seed: int = 1
+) -> str:
+    """
+    Write a workbook in the layout process_excel_file expects.
+
+    Args:
+        path: Output .xlsx path
+        sheets: Number of sheets ("الصف <grade><section>")
+        students: Students per sheet
+        assessments: Assessment columns per sheet ("<subject> - <title>")
+        seed: Random seed
+
+    Returns:
+        path
+    """
+    rnd = random.Random(seed)
+    wb = Workbook(write_only=True)
+    grades = ["أول", "ثاني", "ثالث", "رابع", "خامس", "سادس"]
+    headers = [f"{SUBJECTS[column % len(SUBJECTS)]} - تقييم {column + 1}" for column in range(assessments)]
+    due_dates = [SCHOOL_YEAR_START + timedelta(days=rnd.randint(0, 270)) for _ in range(assessments)]
+
+    for position in range(sheets):
+        ws = wb.create_sheet(f"الصف {grades[position % len(grades)]}{position // len(grades) % 9 + 1}")
+
+        ws.append(["تقرير التقييمات"])
+        ws.append([None] * 6 + due_dates)
+        ws.append(["Student Name", "ID", "Email", "Class", "Notes", "Overall"] + headers)
+        for student in range(students):
+            scores = [rnd.choice([rnd.randint(0, 100), 100, 0, None, "M"]) for _ in range(assessments)]
+            ws.append([f"طالب {position + 1}-{student + 1}", None, None, None, None, rnd.uniform(0, 100)] + scores)
+
+    wb.save(path)
+    return path
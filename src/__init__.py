@@ -6,8 +6,15 @@ Author: saharred
 License: MIT
 """
 
-from .analyzer import AssessmentAnalyzer, generate_html_report
-
 __version__ = "3.7"
 __author__ = "saharred"
 __all__ = ["AssessmentAnalyzer", "generate_html_report"]
+
+
+def __getattr__(name):
+    # Load the analyzer (and pandas) on first use, so importing a light
+    # submodule such as src.diagnostics or running the CLI's --help stays fast
+    if name in __all__:
+        from . import analyzer
+        return getattr(analyzer, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
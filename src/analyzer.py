@@ -1,8 +1,23 @@
+import hashlib
+import json
+import numpy as np
 import pandas as pd
 from datetime import datetime, date
-from typing import List, Dict, Optional, Tuple, Union
-import streamlit as st
-import re
+from functools import lru_cache
+from itertools import chain, islice
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Dict, Optional, Sequence, Tuple, Union
+
+from .categories import CategoryBucketer
+from .diagnostics import CallbackDiagnostics, CollectingDiagnostics, Diagnostics, LoggingDiagnostics
+from .dates import date_range_mask, normalize_arabic_digits, parse_date, parse_dates
+from .profiling import NULL_PROFILER, Profiler
+from .results import StudentResults
+from .workbook import STATUS_IGNORED, STATUS_MISSING, STATUS_SOLVED, AnalyzedWorkbook, SheetMatrix
+
+# The cache, process pool and HTML report modules are imported where they are
+# used, so importing the analyzer loads only what scoring needs
+if TYPE_CHECKING:
+    from .cache import ResultCache
 
 # Category thresholds and recommendations
 CATEGORY_CONFIG = {
@@ -28,8 +43,23 @@ CATEGORY_CONFIG = {
     }
 }
 
+# Threshold edges sorted once and shared by every scoring path
+CATEGORY_BUCKETER = CategoryBucketer(
+    {category: config["threshold"] for category, config in CATEGORY_CONFIG.items()},
+    default="تحتاج إلى تحسين"
+)
+
 ZERO_SOLVED_MESSAGE = "لم يتم حل التقييمات الأسبوعية، حاول وستجد الرحلة ممتعة"
 
+# Cell markers that do not count as an assessment (compared after strip/upper)
+IGNORED_VALUES = ["I", "AB", "X", "", "-", "—", "–", "NAN", "NONE"]
+
+# Excel error cells, read as empty like pandas does
+EXCEL_ERROR_VALUES = {"#NULL!", "#DIV/0!", "#VALUE!", "#REF!", "#NAME?", "#NUM!", "#N/A"}
+
+# Names column entries that are headers or totals rather than students
+NON_STUDENT_NAMES = ["الطالب", "الطالبة", "المجموع", "TOTAL"]
+
 # Thresholds for performance analysis
 PERFORMANCE_THRESHOLD = 70  # Students below 70% are considered inactive
 CRITICAL_THRESHOLD = 50    # Students below 50% are critical
@@ -43,7 +73,9 @@ class AssessmentAnalyzer:
         names_col: str = "A",
         due_row: int = 3,
         # يقبل تاريخين من نوع date أو datetime
-        date_range: Optional[Tuple[Union[date, datetime], Union[date, datetime]]] = None
+        date_range: Optional[Tuple[Union[date, datetime], Union[date, datetime]]] = None,
+        diagnostics: Optional[Diagnostics] = None,
+        profiler: Optional[Profiler] = None
     ):
         """
         Initialize assessment analyzer
@@ -54,12 +86,100 @@ class AssessmentAnalyzer:
             names_col: Column letter for student names (default A)
             due_row: Row number for due dates (default 3)
             date_range: Optional date range filter (start_date, end_date)
+            diagnostics: Where warnings/errors go (logged to "src.analyzer" by default)
+            profiler: Records time/rows/memory per stage and sheet (nothing by default)
         """
         self.start_col_letter = start_col_letter.upper()
         self.names_row = names_row - 1  # Convert to 0-indexed (first student row)
         self.names_col = self._col_letter_to_index(names_col.upper())
         self.due_row = due_row - 1  # Convert to 0-indexed (due date row)
         self.date_range = date_range
+        self.diagnostics = diagnostics if diagnostics is not None else LoggingDiagnostics()
+        self.profiler = profiler if profiler is not None else NULL_PROFILER
+        # Last result per sheet name: (fingerprint, records, messages)
+        self._sheet_memo: Dict[str, Tuple[str, List[Dict], List[Tuple[str, str]]]] = {}
+    
+    def __getstate__(self) -> Dict:
+        # Worker processes get the settings only, not earlier sheet results.
+        # Sinks may hold unpicklable callbacks; workers collect their messages
+        # and the parent reports them to the real sink
+        state = self.__dict__.copy()
+        state["_sheet_memo"] = {}
+        state["profiler"] = NULL_PROFILER
+        state["diagnostics"] = CollectingDiagnostics()
+        return state
+    
+    def cache_settings(self) -> Dict:
+        """Settings that change the analysis result, used in cache keys."""
+        return {
+            "start_col_letter": self.start_col_letter,
+            "names_row": self.names_row,
+            "names_col": self.names_col,
+            "due_row": self.due_row,
+            "date_range": [str(d) for d in self.date_range] if self.date_range else None,
+        }
+    
+    def sheet_fingerprint(self, df: pd.DataFrame, sheet_name: str) -> str:
+        """Hash a sheet's cell content together with the analyzer settings and cache version."""
+        from .cache import CACHE_VERSION
+        digest = hashlib.sha256()
+        digest.update(json.dumps(
+            {"version": CACHE_VERSION, "sheet": sheet_name, "shape": list(df.shape), **self.cache_settings()},
+            sort_keys=True,
+            ensure_ascii=False
+        ).encode("utf-8"))
+        if df.size:
+            digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        return digest.hexdigest()
+    
+    def _analyze_sheet_tracked(
+        self,
+        df: pd.DataFrame,
+        sheet_name: str
+    ) -> Tuple[List[Dict], List[Tuple[str, str]]]:
+        """Run analyze_sheet and return its records with the messages it raised."""
+        outer_diagnostics = self.diagnostics
+        collected = CollectingDiagnostics()
+        self.diagnostics = collected
+        try:
+            records = self.analyze_sheet(df, sheet_name)
+            return records, collected.messages
+        finally:
+            self.diagnostics = outer_diagnostics
+    
+    def _analyze_sheet_incremental(
+        self,
+        df: pd.DataFrame,
+        sheet_name: str,
+        cache: Optional["ResultCache"] = None
+    ) -> List[Dict]:
+        """
+        Analyze a sheet, reusing the previous result when its fingerprint is
+        unchanged (from memory, or from the on-disk cache when given).
+        """
+        with self.profiler.stage("fingerprint", sheet=sheet_name, cells=df.size):
+            fingerprint = self.sheet_fingerprint(df, sheet_name)
+        memo = self._sheet_memo.get(sheet_name)
+        
+        if memo is not None and memo[0] == fingerprint:
+            records, messages = memo[1], memo[2]
+        else:
+            entry = cache.get_entry(fingerprint) if cache is not None else None
+            if entry is not None:
+                records, messages = entry
+            else:
+                records, messages = self._analyze_sheet_tracked(df, sheet_name)
+                if cache is not None:
+                    cache.put(fingerprint, records, messages)
+            self._sheet_memo[sheet_name] = (fingerprint, records, messages)
+        
+        for level, message in messages:
+            self._notify(level, message)
+        return list(records)
+    
+    def _notify(self, level: str, message: str):
+        """Report a warning/error to the diagnostics sink."""
+        self.diagnostics.report(level, message)
     
     def _col_letter_to_index(self, col_letter: str) -> int:
         """Convert column letter (A, B, ..., Z, AA, AB, ...) to 0-indexed integer."""
@@ -81,107 +201,18 @@ class AssessmentAnalyzer:
     
     def _normalize_arabic_digits(self, text: str) -> str:
         """Convert Arabic-Indic digits (٠-٩) to ASCII digits (0-9)."""
-        if not isinstance(text, str):
-            return str(text)
-        return text.translate(str.maketrans("٠١٢٣٤٥٦٧٨٩", "0123456789"))
+        return normalize_arabic_digits(text)
 
     def _parse_date(self, date_obj) -> Optional[date]:
         """Parse various date formats (Arabic/English/Excel serial) to date."""
-        # Empty
-        try:
-            if pd.isna(date_obj):
-                return None
-        except Exception:
-            pass
-
-        # Pandas/Datetime
-        if isinstance(date_obj, pd.Timestamp):
-            return date_obj.date()
-        if isinstance(date_obj, datetime):
-            return date_obj.date()
-
-        # Excel serial number
-        if isinstance(date_obj, (int, float)) and not pd.isna(date_obj):
-            try:
-                base = pd.to_datetime("1899-12-30")
-                dt = base + pd.to_timedelta(float(date_obj), unit="D")
-                return dt.date()
-            except Exception:
-                pass
-
-        # String parsing
-        if isinstance(date_obj, str):
-            s = date_obj.strip()
-            if not s:
-                return None
-            s = self._normalize_arabic_digits(s)
-
-            # Arabic months
-            arabic_months = {
-                "يناير": 1, "كانون الثاني": 1, "جانفي": 1,
-                "فبراير": 2, "شباط": 2, "فيفري": 2,
-                "مارس": 3, "اذار": 3, "آذار": 3,
-                "ابريل": 4, "أبريل": 4, "نيسان": 4, "افريل": 4,
-                "مايو": 5, "ماي": 5, "ايار": 5, "أيار": 5,
-                "يونيو": 6, "يونيه": 6, "حزيران": 6, "جوان": 6,
-                "يوليو": 7, "يوليه": 7, "تموز": 7, "جويلية": 7,
-                "اغسطس": 8, "أغسطس": 8, "اب": 8, "آب": 8, "اوت": 8,
-                "سبتمبر": 9, "ايلول": 9, "أيلول": 9, "سيبتمبر": 9,
-                "اكتوبر": 10, "أكتوبر": 10, "تشرين الاول": 10, "تشرين الأول": 10,
-                "نوفمبر": 11, "تشرين الثاني": 11, "نونبر": 11,
-                "ديسمبر": 12, "كانون الاول": 12, "كانون الأول": 12, "دجنبر": 12,
-            }
-
-            def normalize_hamza(text: str) -> str:
-                return text.replace("أ", "ا").replace("إ", "ا").replace("آ", "ا").replace("ـ", "")
-
-            # يدعم الترتيبين: "2 أكتوبر" و"أكتوبر 2"
-            pattern_day_first = r"(\d{1,2})\s*[-/\s]*\s*([^\d\s]+)"
-            pattern_month_first = r"([^\d\s]+)\s*[-/\s]*\s*(\d{1,2})"
-
-            m = re.search(pattern_day_first, s) or re.search(pattern_month_first, s)
-            if m:
-                try:
-                    # تحديد الترتيب
-                    if re.fullmatch(pattern_day_first, m.group(0)):
-                        day = int(m.group(1))
-                        month_name = m.group(2).strip()
-                    else:
-                        month_name = m.group(1).strip()
-                        day = int(m.group(2))
-
-                    month = arabic_months.get(month_name)
-                    if month is None:
-                        nm = normalize_hamza(month_name)
-                        for k, v in arabic_months.items():
-                            if normalize_hamza(k) == nm:
-                                month = v
-                                break
-                    if month:
-                        # Use current year when year is not provided
-                        y = date.today().year
-                        # Clamp day to 28 to be safe
-                        safe_day = min(day, 28)
-                        return date(y, month, safe_day)
-                except Exception:
-                    pass
-
-            # Fallback to pandas
-            try:
-                parsed = pd.to_datetime(s, dayfirst=True, errors="coerce")
-                if pd.notna(parsed):
-                    return parsed.date()
-            except Exception:
-                pass
-
-        return None
+        return parse_date(date_obj)
     
     def _is_ignored_value(self, value) -> bool:
         """Check if value should be ignored (I, AB, X, dashes, or empty)."""
         if pd.isna(value):
             return True
         str_value = str(value).strip().upper()
-        return str_value in ["I", "AB", "X", "", "-", "—", "–", "NAN", "NONE"]
+        return str_value in IGNORED_VALUES
     
     def _is_missing_value(self, value) -> bool:
         """Check if value is 'M' (missing submission)."""
@@ -191,14 +222,40 @@ class AssessmentAnalyzer:
     
     def _get_category(self, solve_pct: float) -> str:
         """Determine category based on solve_pct."""
-        for category, config in sorted(
-            CATEGORY_CONFIG.items(),
-            key=lambda x: x[1]["threshold"],
-            reverse=True
-        ):
-            if solve_pct >= config["threshold"]:
-                return category
-        return "تحتاج إلى تحسين"
+        return CATEGORY_BUCKETER.assign_one(solve_pct)
+    
+    def _get_categories(self, solve_pcts: np.ndarray) -> List[str]:
+        """Determine categories for an array of solve_pct values at once."""
+        return CATEGORY_BUCKETER.assign(solve_pcts).tolist()
+    
+    def _normalize_cells(self, values: np.ndarray, upper: bool = False) -> np.ndarray:
+        """Stripped (optionally upper-cased) string form of every cell in an object array."""
+        flat = pd.Series(values.ravel(), dtype=object).astype(str).str.strip()
+        if upper:
+            flat = flat.str.upper()
+        return flat.to_numpy(dtype=object).reshape(values.shape)
+    
+    def _classify_cells(self, block: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Classify an assessment block into (ignored, missing) boolean masks.
+        Cells that are neither ignored nor missing count as solved.
+        """
+        values = block.to_numpy(dtype=object)
+        normalized = self._normalize_cells(values, upper=True)
+        ignored = pd.isna(values) | np.isin(normalized, IGNORED_VALUES)
+        missing = ~ignored & (normalized == "M")
+        return ignored, missing
+    
+    def _student_names(self, names: pd.Series) -> Tuple[List[str], np.ndarray]:
+        """Return stripped student names and a mask of rows that hold real students."""
+        values = names.to_numpy(dtype=object)
+        stripped = self._normalize_cells(values)
+        valid = (
+            ~pd.isna(values)
+            & (stripped != "")
+            & ~np.isin(self._normalize_cells(values, upper=True), NON_STUDENT_NAMES)
+        )
+        return stripped.tolist(), valid
     
     def _get_recommendation(self, category: str, total: int, solved: int) -> str:
         """Get recommendation text based on category."""
@@ -208,6 +265,34 @@ class AssessmentAnalyzer:
         
         return CATEGORY_CONFIG.get(category, {}).get("recommendation", "")
     
+    def _build_record(
+        self,
+        student_name: str,
+        sheet_info: Tuple[str, str, str],
+        total_assessments: int,
+        solved_assessments: int,
+        remaining: int,
+        unsolved_titles: List[str],
+        solve_pct: float,
+        category: str
+    ) -> Dict:
+        """Assemble one student record; sheet_info is (subject, level, section)."""
+        subject, level, section = sheet_info
+        return {
+            "student_name": student_name,
+            "class": level,
+            "section": section,
+            "subject": subject,
+            "total_material_solved": solved_assessments,
+            "total_assessments": total_assessments,
+            "remaining": remaining,
+            "unsolved_assessment_count": len(unsolved_titles),
+            "unsolved_titles": ", ".join(unsolved_titles) if unsolved_titles else "-",
+            "solve_pct": round(solve_pct, 2),
+            "category": category,
+            "recommendation": self._get_recommendation(category, total_assessments, solved_assessments)
+        }
+    
     def _parse_sheet_name(self, sheet_name: str) -> Tuple[str, str, str]:
         """
         Parse sheet name format: 'المادة المستوى الشعبة'
@@ -230,454 +315,499 @@ class AssessmentAnalyzer:
         else:
             return sheet_name, "", ""
     
-    def analyze_sheet(
+    def _find_assessment_columns(
         self,
         df: pd.DataFrame,
-        sheet_name: str
+        non_empty: np.ndarray,
+        date_range: Optional[Tuple[Union[date, datetime], Union[date, datetime]]] = None
     ) -> List[Dict]:
-        """Analyze a single sheet and return list of student records."""
-        results = []
-        
-        # Parse sheet name to get subject, level, and section
-        subject, level, section = self._parse_sheet_name(sheet_name)
+        """
+        Select assessment columns from the header row, due dates and date range.
         
-        # Find assessment columns (from H1 rightward)
+        non_empty marks, for every column from start_col_letter onward, whether
+        any student cell holds a countable value.
+        """
         start_col_idx = self._col_letter_to_index(self.start_col_letter)
-        assessment_columns = []
         
         # Row 1 (index 0) for assessment names
         headers_row_idx = 0
-        if headers_row_idx < len(df):
-            for col_idx in range(start_col_idx, len(df.columns)):
-                header = df.iloc[headers_row_idx, col_idx]
-                if pd.isna(header):
-                    continue
-                header_str = str(header).strip()
-
-                # Ignore empty headers, OVERALL, or headers containing dashes
-                if not header_str:
-                    continue
-                if header_str.upper() == "OVERALL":
-                    continue
-                if any(ch in header_str for ch in ["-", "—", "–"]):
-                    continue
-
-                # Get due date from due_row
-                due_date: Optional[date] = None
-                if self.due_row < len(df):
-                    due_date_raw = df.iloc[self.due_row, col_idx]
-                    due_date = self._parse_date(due_date_raw)
-
-                # Date range filter (accept date or datetime in input)
-                if self.date_range:
-                    if due_date is None:
-                        continue
-                    start_date_raw, end_date_raw = self.date_range
-                    start_date = start_date_raw.date() if isinstance(start_date_raw, datetime) else start_date_raw
-                    end_date = end_date_raw.date() if isinstance(end_date_raw, datetime) else end_date_raw
-                    if start_date and end_date and start_date > end_date:
-                        start_date, end_date = end_date, start_date
-                    if start_date and end_date and not (start_date <= due_date <= end_date):
-                        continue
-
-                # Skip columns that are fully empty/dashes for all students
-                is_all_dashes = True
-                for row_idx in range(self.names_row, len(df)):
-                    cell_val = df.iloc[row_idx, col_idx]
-                    if not self._is_ignored_value(cell_val):
-                        is_all_dashes = False
-                        break
-                if is_all_dashes:
-                    continue
-
-                assessment_columns.append({
-                    "col_idx": col_idx,
-                    "name": header_str,
-                    "due_date": due_date,
-                })
+        if headers_row_idx >= len(df) or start_col_idx >= len(df.columns):
+            return []
+        
+        headers = df.iloc[headers_row_idx, start_col_idx:].to_numpy(dtype=object)
+        due_row_values = df.iloc[self.due_row, start_col_idx:] if self.due_row < len(df) else None
+        return self._select_assessment_columns(headers, due_row_values, date_range, non_empty)
+    
+    def _select_assessment_columns(
+        self,
+        headers: np.ndarray,
+        due_row_values: Optional[Sequence],
+        date_range: Optional[Tuple[Union[date, datetime], Union[date, datetime]]] = None,
+        non_empty: Optional[np.ndarray] = None
+    ) -> List[Dict]:
+        """
+        Apply the header, due-date and emptiness filters to the cells from
+        start_col_letter onward of the header row and the due row.
+        """
+        start_col_idx = self._col_letter_to_index(self.start_col_letter)
+        header_strs = self._normalize_cells(headers)
+        
+        # Ignore empty headers, OVERALL, or headers containing dashes
+        header_text = pd.Series(header_strs, dtype=object)
+        candidates = (
+            ~pd.isna(headers)
+            & (header_strs != "")
+            & (header_text.str.upper() != "OVERALL").to_numpy()
+            & ~header_text.str.contains("[-—–]", regex=True).to_numpy(dtype=bool)
+        )
+        
+        # Due dates from due_row, parsed for the whole row at once
+        if due_row_values is not None:
+            with self.profiler.stage("parse_dates", cells=len(due_row_values)):
+                due_dates = parse_dates(due_row_values)
+        else:
+            due_dates = np.full(len(headers), None, dtype=object)
+        
+        # Date range filter (accept date or datetime in input)
+        candidates &= date_range_mask(due_dates, date_range)
+        
+        # Skip columns that are fully empty/dashes for all students
+        if non_empty is not None:
+            candidates &= non_empty
+        
+        assessment_columns = []
+        for offset in np.flatnonzero(candidates):
+            assessment_columns.append({
+                "col_idx": start_col_idx + int(offset),
+                "name": header_strs[offset],
+                "due_date": due_dates[offset],
+            })
         
+        return assessment_columns
+    
+    def build_sheet_matrix(
+        self,
+        df: pd.DataFrame,
+        sheet_name: str,
+        date_range: Optional[Tuple[Union[date, datetime], Union[date, datetime]]] = None
+    ) -> Optional[SheetMatrix]:
+        """
+        Classify a sheet into a status matrix of student rows × assessment
+        columns, keeping only columns due within date_range (all columns when
+        None). Returns None when the sheet has no assessment columns.
+        """
+        # Classify every student cell from H rightward once; the masks serve
+        # both the column-emptiness index and the status matrix
+        start_col_idx = self._col_letter_to_index(self.start_col_letter)
+        with self.profiler.stage("classify_cells", sheet=sheet_name) as stage:
+            ignored, missing = self._classify_cells(df.iloc[self.names_row:, start_col_idx:])
+            stage.count(rows=ignored.shape[0], cells=ignored.size)
+        non_empty = ~ignored.all(axis=0)
+        
+        # Find assessment columns (from H1 rightward)
+        with self.profiler.stage("find_headers", sheet=sheet_name, cells=len(non_empty)):
+            assessment_columns = self._find_assessment_columns(df, non_empty, date_range)
         if not assessment_columns:
-            st.warning(f"لم أجد أسماء تقييمات في H1 يميناً في ورقة '{sheet_name}'.")
+            return None
+        
+        # Student rows start from row 5, index 4
+        names, valid_names = self._student_names(df.iloc[self.names_row:, self.names_col])
+        offsets = [a["col_idx"] - start_col_idx for a in assessment_columns]
+        status = np.full((len(names), len(offsets)), STATUS_SOLVED, dtype=np.int8)
+        status[missing[:, offsets]] = STATUS_MISSING
+        status[ignored[:, offsets]] = STATUS_IGNORED
+        
+        rows = np.flatnonzero(valid_names)
+        return SheetMatrix(
+            sheet_name,
+            self._parse_sheet_name(sheet_name),
+            [names[row] for row in rows],
+            [a["name"] for a in assessment_columns],
+            np.array([a["due_date"] for a in assessment_columns], dtype=object),
+            status[rows]
+        )
+    
+    def _score_status(self, matrix: SheetMatrix, column_mask: Optional[np.ndarray] = None) -> Optional[Dict]:
+        """Per-student counts of a status matrix, for students with at least one assessment."""
+        status = matrix.status if column_mask is None else matrix.status[:, column_mask]
+        titles = matrix.titles if column_mask is None else matrix.titles[column_mask]
+        missing = status == STATUS_MISSING
+        total = (status != STATUS_IGNORED).sum(axis=1)
+        remaining = missing.sum(axis=1)
+        solved = total - remaining
+        rows = np.flatnonzero(total > 0)
+        if len(rows) == 0:
+            return None
+        solve_pct = solved[rows] / total[rows] * 100
+        return {
+            "rows": rows,
+            "titles": titles,
+            "missing": missing[rows],
+            "total": total[rows],
+            "solved": solved[rows],
+            "remaining": remaining[rows],
+            "solve_pct": solve_pct,
+            "categories": self._get_categories(solve_pct),
+        }
+
+    def score_matrix(self, matrix: SheetMatrix, column_mask: Optional[np.ndarray] = None) -> List[Dict]:
+        """Score every student of a status matrix, optionally on a subset of columns."""
+        results = []
+        scores = self._score_status(matrix, column_mask)
+        if scores is None:
             return results
-        
-        # Process each student (starting from row 5, index 4)
-        for student_row_idx in range(self.names_row, len(df)):
-            student_name = df.iloc[student_row_idx, self.names_col]
-            
-            if pd.isna(student_name) or str(student_name).strip() == "":
-                continue
+        titles = scores["titles"]
+        for i, (row, pct, category) in enumerate(zip(scores["rows"], scores["solve_pct"].tolist(), scores["categories"])):
+            results.append(self._build_record(
+                matrix.student_names[row], matrix.sheet_info,
+                int(scores["total"][i]), int(scores["solved"][i]), int(scores["remaining"][i]),
+                titles[scores["missing"][i]].tolist(), pct, category
+            ))
+        return results
+
+    def score_matrix_compact(self, matrix: SheetMatrix, column_mask: Optional[np.ndarray] = None) -> StudentResults:
+        """Same as score_matrix, but returned as a compact StudentResults container."""
+        scores = self._score_status(matrix, column_mask)
+        if scores is None:
+            return StudentResults.from_records([])
+        total = scores["total"].tolist()
+        solved = scores["solved"].tolist()
+        return StudentResults.from_sheet(
+            [matrix.student_names[row] for row in scores["rows"]],
+            matrix.sheet_info,
+            {
+                "total_material_solved": scores["solved"],
+                "total_assessments": scores["total"],
+                "remaining": scores["remaining"],
+            },
+            [round(pct, 2) for pct in scores["solve_pct"].tolist()],
+            scores["categories"],
+            [self._get_recommendation(c, t, s) for c, t, s in zip(scores["categories"], total, solved)],
+            scores["titles"].tolist(),
+            scores["missing"]
+        )
+    
+    def analyze_sheet(
+        self,
+        df: pd.DataFrame,
+        sheet_name: str
+    ) -> List[Dict]:
+        """Analyze a single sheet and return list of student records."""
+        with self.profiler.stage("analyze_sheet", sheet=sheet_name, rows=len(df), cells=df.size):
+            matrix = self.build_sheet_matrix(df, sheet_name, self.date_range)
             
-            student_name = str(student_name).strip()
+            if matrix is None:
+                self._notify("warning", f"لم أجد أسماء تقييمات في H1 يميناً في ورقة '{sheet_name}'.")
+                return []
             
-            # Skip if it looks like a header or total row
-            if student_name.upper() in ["الطالب", "الطالبة", "المجموع", "TOTAL"]:
+            with self.profiler.stage("score", cells=matrix.status.size) as stage:
+                records = self.score_matrix(matrix)
+                stage.count(rows=len(records))
+            return records
+    
+    def _stream_value(self, value):
+        """Match openpyxl cell values to what pandas.read_excel produces."""
+        if isinstance(value, str) and value in EXCEL_ERROR_VALUES:
+            return None
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        return value
+    
+    def _student_name(self, value) -> Optional[str]:
+        """Return the stripped student name, or None for non-student rows."""
+        if pd.isna(value) or str(value).strip() == "":
+            return None
+        student_name = str(value).strip()
+        
+        # Skip if it looks like a header or total row
+        if student_name.upper() in NON_STUDENT_NAMES:
+            return None
+        return student_name
+    
+    def stream_sheet(
+        self,
+        rows: Iterable[Sequence],
+        sheet_name: str
+    ) -> Iterator[Dict]:
+        """
+        Score student rows one at a time as they are read.
+        
+        Only the header and due-date rows are kept; each student row is
+        scored and yields its record immediately, so memory stays bounded by
+        a single row. Produces the same records as analyze_sheet.
+        
+        Args:
+            rows: Iterator of row value tuples (e.g. openpyxl values_only rows)
+            sheet_name: Sheet name ('المادة المستوى الشعبة')
+        """
+        sheet_info = self._parse_sheet_name(sheet_name)
+        start_col_idx = self._col_letter_to_index(self.start_col_letter)
+        rows = iter(rows)
+        
+        # Buffer rows up to the due row for the header metadata
+        header_rows = list(islice(rows, max(0, self.due_row) + 1))
+        header_cells = header_rows[0][start_col_idx:] if header_rows else ()
+        headers = np.array([self._stream_value(v) for v in header_cells], dtype=object)
+        
+        due_row_values = None
+        if self.due_row < len(header_rows):
+            due_row = header_rows[self.due_row]
+            due_row_values = [
+                due_row[col] if col < len(due_row) else None
+                for col in range(start_col_idx, start_col_idx + len(headers))
+            ]
+        
+        assessment_columns = self._select_assessment_columns(headers, due_row_values, self.date_range)
+        if not assessment_columns:
+            self._notify("warning", f"لم أجد أسماء تقييمات في H1 يميناً في ورقة '{sheet_name}'.")
+            return
+        
+        has_values = False
+        
+        for row_idx, row in enumerate(chain(header_rows, rows)):
+            # Rows above the names row (e.g. Excel row 4 with the default
+            # layout) are not students, even when they follow the due row
+            if row_idx < self.names_row:
                 continue
             
-            # Calculate metrics
             total_assessments = 0
-            solved_assessments = 0
             remaining = 0
             unsolved_titles = []
             
             for assessment in assessment_columns:
                 col_idx = assessment["col_idx"]
-                value = df.iloc[student_row_idx, col_idx]
-                
+                value = self._stream_value(row[col_idx]) if col_idx < len(row) else None
                 if self._is_ignored_value(value):
                     continue
                 
                 total_assessments += 1
-                
                 if self._is_missing_value(value):
                     remaining += 1
                     unsolved_titles.append(assessment["name"])
-                else:
-                    solved_assessments += 1
             
-            # Skip students with no assessments
-            if total_assessments == 0:
+            has_values = has_values or total_assessments > 0
+            
+            # Skip non-student rows and students with no assessments
+            student_name = self._student_name(
+                self._stream_value(row[self.names_col]) if self.names_col < len(row) else None
+            )
+            if student_name is None or total_assessments == 0:
                 continue
             
-            # Calculate solve percentage
-            solve_pct = (solved_assessments / total_assessments * 100) if total_assessments > 0 else 0
+            solved_assessments = total_assessments - remaining
+            solve_pct = solved_assessments / total_assessments * 100
+            yield self._build_record(
+                student_name, sheet_info,
+                total_assessments, solved_assessments, remaining,
+                unsolved_titles, solve_pct, self._get_category(solve_pct)
+            )
+        
+        if not has_values:
+            self._notify("warning", f"لم أجد أسماء تقييمات في H1 يميناً في ورقة '{sheet_name}'.")
+    
+    def stream_file(self, file_obj, sheets: List[str]) -> Iterator[Dict]:
+        """
+        Stream student records from an .xlsx workbook using openpyxl
+        read-only mode, without loading whole sheets into DataFrames.
+        """
+        from openpyxl import load_workbook
+        
+        wb = load_workbook(file_obj, read_only=True, data_only=True)
+        try:
+            for sheet_name in sheets:
+                if sheet_name not in wb.sheetnames:
+                    continue
+                yield from self.stream_sheet(wb[sheet_name].iter_rows(values_only=True), sheet_name)
+        finally:
+            wb.close()
+    
+    def _in_used_range(self, col_idx: int) -> bool:
+        """Check if a column is the names column or lies from start_col_letter onward."""
+        return col_idx == self.names_col or col_idx >= self._col_letter_to_index(self.start_col_letter)
+    
+    def load_sheets(
+        self,
+        file_obj,
+        sheets: List[str],
+        used_range_only: bool = False
+    ) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """
+        Parse the workbook once and yield (sheet_name, DataFrame) for each selected sheet.
+        
+        Args:
+            file_obj: Uploaded file or path
+            sheets: Sheet names to load (missing sheets are skipped)
+            used_range_only: Only read the names column and the columns from
+                start_col_letter onward; other columns come back empty so
+                column positions are unchanged
+        """
+        # Determine engine based on file extension
+        file_name = file_obj.name if hasattr(file_obj, 'name') else str(file_obj)
+        engine = "xlrd" if file_name.endswith(".xls") else None
+        
+        with self.profiler.stage("open_workbook"):
+            xls = pd.ExcelFile(file_obj, engine=engine)
+        with xls:
+            for sheet_name in sheets:
+                if sheet_name not in xls.sheet_names:
+                    continue
+                
+                with self.profiler.stage("read_sheet", sheet=sheet_name) as stage:
+                    df = self.parse_sheet(xls, sheet_name, used_range_only)
+                    stage.count(rows=len(df), cells=df.size)
+                yield sheet_name, df
+    
+    def parse_sheet(
+        self,
+        xls: pd.ExcelFile,
+        sheet_name: str,
+        used_range_only: bool = False
+    ) -> pd.DataFrame:
+        """Read one sheet without headers from an already opened workbook."""
+        usecols = self._in_used_range if used_range_only else None
+        df = xls.parse(sheet_name, header=None, usecols=usecols)
+        if used_range_only and len(df.columns) > 0:
+            df = df.reindex(columns=range(int(df.columns.max()) + 1))
+        return df
+    
+    def analyze_file(
+        self,
+        file_obj,
+        sheets: List[str],
+        used_range_only: bool = False,
+        workers: int = 1,
+        streaming: bool = False,
+        cache: Optional["ResultCache"] = None
+    ) -> List[Dict]:
+        """
+        Analyze an uploaded file for specified sheets.
+        
+        Args:
+            file_obj: Uploaded file or path
+            sheets: Sheet names to analyze
+            used_range_only: Only read the columns the analysis needs
+            workers: Number of worker processes; values above 1 parse and
+                score sheets in a process pool (results keep sheet order)
+            streaming: Score .xlsx rows while reading them instead of loading
+                each sheet into a DataFrame (.xls files are loaded normally)
+            cache: Optional on-disk ResultCache; a workbook already analyzed
+                with the same settings is returned without parsing it
+        
+        Sheets whose cell content is unchanged since the previous call on this
+        analyzer (or found per sheet in the cache) are not scored again.
+        """
+        results = []
+        
+        with self.profiler.stage("analyze_file") as file_stage:
+            try:
+                if cache is not None:
+                    from .parallel import read_file_bytes
+                    cache_key = cache.make_key(
+                        read_file_bytes(file_obj),
+                        {**self.cache_settings(), "sheets": list(sheets)}
+                    )
+                    cached = cache.get_entry(cache_key)
+                    if cached is not None:
+                        results, messages = cached
+                        for level, message in messages:
+                            self._notify(level, message)
+                        return results
+                    
+                    # Store the warnings of this run with the workbook entry,
+                    # so a later hit reports them too
+                    outer_diagnostics = self.diagnostics
+                    messages: List[Tuple[str, str]] = []
+                    
+                    def record(level: str, message: str):
+                        messages.append((level, message))
+                        outer_diagnostics.report(level, message)
+                    
+                    self.diagnostics = CallbackDiagnostics(record)
+                    try:
+                        results = self._analyze_sheets(file_obj, sheets, used_range_only, workers, streaming, cache)
+                    finally:
+                        self.diagnostics = outer_diagnostics
+                    cache.put(cache_key, results, messages)
+                else:
+                    results = self._analyze_sheets(file_obj, sheets, used_range_only, workers, streaming)
             
-            # Get category and recommendation
-            category = self._get_category(solve_pct)
-            recommendation = self._get_recommendation(category, total_assessments, solved_assessments)
+            except Exception as e:
+                self._notify("error", f"خطأ في قراءة الملف: {str(e)}")
             
-            results.append({
-                "student_name": student_name,
-                "class": level,
-                "section": section,
-                "subject": subject,
-                "total_material_solved": solved_assessments,
-                "total_assessments": total_assessments,
-                "remaining": remaining,
-                "unsolved_assessment_count": len(unsolved_titles),
-                "unsolved_titles": ", ".join(unsolved_titles) if unsolved_titles else "-",
-                "solve_pct": round(solve_pct, 2),
-                "category": category,
-                "recommendation": recommendation
-            })
+            file_stage.count(rows=len(results))
         
         return results
     
-    def analyze_file(
+    def _analyze_sheets(
         self,
         file_obj,
-        sheets: List[str]
+        sheets: List[str],
+        used_range_only: bool,
+        workers: int,
+        streaming: bool,
+        cache: Optional["ResultCache"] = None
     ) -> List[Dict]:
-        """Analyze an uploaded file for specified sheets."""
+        """Records of the selected sheets, read the way analyze_file was asked to."""
         results = []
+        file_name = file_obj.name if hasattr(file_obj, 'name') else str(file_obj)
+        if streaming and not file_name.endswith(".xls"):
+            with self.profiler.stage("stream_file") as stage:
+                results.extend(self.stream_file(file_obj, sheets))
+                stage.count(rows=len(results))
+        elif workers > 1 and len(sheets) > 1:
+            from .parallel import analyze_sheets_parallel
+            # Stages inside the worker processes are not recorded
+            known = {name: memo[0] for name, memo in self._sheet_memo.items()}
+            for sheet_name, fingerprint, sheet_results, messages in analyze_sheets_parallel(
+                self, file_obj, sheets, workers, used_range_only, known
+            ):
+                if sheet_results is None:
+                    # Unchanged since the last analysis
+                    _, sheet_results, messages = self._sheet_memo[sheet_name]
+                elif fingerprint is not None:
+                    self._sheet_memo[sheet_name] = (fingerprint, sheet_results, messages)
+                results.extend(sheet_results)
+                for level, message in messages:
+                    self._notify(level, message)
+        else:
+            for sheet_name, df in self.load_sheets(file_obj, sheets, used_range_only):
+                sheet_results = self._analyze_sheet_incremental(df, sheet_name, cache)
+                results.extend(sheet_results)
+        return results
+    
+    def analyze_workbook(
+        self,
+        file_obj,
+        sheets: List[str],
+        used_range_only: bool = False
+    ) -> AnalyzedWorkbook:
+        """
+        Parse the workbook once into status matrices that can be re-scored
+        for any date range with AnalyzedWorkbook.records(date_range).
+        """
+        matrices = []
         
         try:
-            # Determine engine based on file extension
-            file_name = file_obj.name if hasattr(file_obj, 'name') else str(file_obj)
-            engine = "xlrd" if file_name.endswith(".xls") else None
-            
-            # Read Excel file
-            xls = pd.ExcelFile(file_obj, engine=engine)
-            
-            for sheet_name in sheets:
-                if sheet_name not in xls.sheet_names:
+            for sheet_name, df in self.load_sheets(file_obj, sheets, used_range_only):
+                matrix = self.build_sheet_matrix(df, sheet_name)
+                if matrix is None:
+                    self._notify("warning", f"لم أجد أسماء تقييمات في H1 يميناً في ورقة '{sheet_name}'.")
                     continue
-                
-                # Read sheet without headers
-                df = pd.read_excel(
-                    file_obj,
-                    sheet_name=sheet_name,
-                    header=None,
-                    engine=engine
-                )
-                
-                sheet_results = self.analyze_sheet(df, sheet_name)
-                results.extend(sheet_results)
+                matrices.append(matrix)
         
         except Exception as e:
-            st.error(f"خطأ في قراءة الملف: {str(e)}")
+            self._notify("error", f"خطأ في قراءة الملف: {str(e)}")
         
-        return results
+        return AnalyzedWorkbook(self, matrices)
+
+
+@lru_cache(maxsize=None)
+def _html_renderer():
+    """Renderer shared by all single-student reports, compiled on first use."""
+    from .html_reports import HTMLReportRenderer
+    return HTMLReportRenderer()
 
 
 def generate_html_report(student_row: pd.Series) -> str:
     """Generate an RTL HTML report for a single student."""
-    
-    # Determine category color
-    category_colors = {
-        "البلاتينية": "#f093fb",
-        "الذهبي": "#ffd89b",
-        "الفضي": "#a8edea",
-        "البرونزي": "#ff9a56",
-        "تحتاج إلى تحسين": "#ff6b6b"
-    }
-    
-    category_color = category_colors.get(student_row['category'], "#667eea")
-    
-    html = f"""<!DOCTYPE html>
-<html dir="rtl" lang="ar">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>تقرير الطالب - {student_row['student_name']}</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif, 'Arial';
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            padding: 20px;
-            direction: rtl;
-            text-align: right;
-        }}
-        
-        .container {{
-            max-width: 900px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 10px;
-            box-shadow: 0 10px 40px rgba(0, 0, 0, 0.3);
-            overflow: hidden;
-        }}
-        
-        .header {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 40px;
-            text-align: center;
-        }}
-        
-        .header h1 {{
-            font-size: 2.5em;
-            margin-bottom: 10px;
-        }}
-        
-        .header p {{
-            font-size: 1.1em;
-            opacity: 0.9;
-        }}
-        
-        .content {{
-            padding: 40px;
-        }}
-        
-        .student-info {{
-            background: #f5f5f5;
-            padding: 20px;
-            border-radius: 8px;
-            margin-bottom: 30px;
-            border-right: 4px solid #667eea;
-        }}
-        
-        .info-row {{
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 20px;
-            margin-bottom: 15px;
-        }}
-        
-        .info-item {{
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }}
-        
-        .info-label {{
-            font-weight: bold;
-            color: #333;
-            margin-left: 10px;
-        }}
-        
-        .info-value {{
-            color: #666;
-            font-size: 1.1em;
-        }}
-        
-        .category-box {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 20px;
-            border-radius: 8px;
-            text-align: center;
-            margin: 30px 0;
-        }}
-        
-        .category-box h2 {{
-            font-size: 2em;
-            margin-bottom: 10px;
-        }}
-        
-        .category-box p {{
-            font-size: 1.1em;
-            opacity: 0.95;
-        }}
-        
-        .recommendation {{
-            background: #e8f5e9;
-            border-right: 4px solid #4caf50;
-            padding: 20px;
-            border-radius: 4px;
-            margin: 20px 0;
-            direction: rtl;
-            text-align: right;
-        }}
-        
-        .recommendation p {{
-            color: #2e7d32;
-            font-size: 1.1em;
-            line-height: 1.6;
-        }}
-        
-        .metrics {{
-            display: grid;
-            grid-template-columns: repeat(4, 1fr);
-            gap: 15px;
-            margin: 30px 0;
-        }}
-        
-        .metric {{
-            background: #f9f9f9;
-            padding: 15px;
-            border-radius: 8px;
-            text-align: center;
-            border-top: 3px solid #667eea;
-        }}
-        
-        .metric-value {{
-            font-size: 2em;
-            font-weight: bold;
-            color: #667eea;
-        }}
-        
-        .metric-label {{
-            font-size: 0.9em;
-            color: #666;
-            margin-top: 5px;
-        }}
-        
-        .unsolved-section {{
-            margin: 30px 0;
-        }}
-        
-        .unsolved-section h3 {{
-            color: #333;
-            margin-bottom: 15px;
-            font-size: 1.3em;
-            border-bottom: 2px solid #667eea;
-            padding-bottom: 10px;
-        }}
-        
-        .unsolved-list {{
-            background: #fff3e0;
-            padding: 15px;
-            border-radius: 8px;
-        }}
-        
-        .unsolved-list p {{
-            color: #e65100;
-            line-height: 1.6;
-        }}
-        
-        .footer {{
-            background: #f5f5f5;
-            padding: 20px;
-            text-align: center;
-            color: #999;
-            font-size: 0.9em;
-            margin-top: 30px;
-            border-top: 1px solid #ddd;
-        }}
-        
-        @media print {{
-            body {{
-                background: white;
-            }}
-            .container {{
-                box-shadow: none;
-                max-width: 100%;
-            }}
-            .header {{
-                page-break-after: avoid;
-            }}
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>تقرير الطالب</h1>
-            <p>Weekly Assessment Report</p>
-        </div>
-        
-        <div class="content">
-            <div class="student-info">
-                <div class="info-row">
-                    <div class="info-item">
-                        <span class="info-value">{student_row['student_name']}</span>
-                        <span class="info-label">اسم الطالب:</span>
-                    </div>
-                    <div class="info-item">
-                        <span class="info-value">{student_row['subject']}</span>
-                        <span class="info-label">المادة:</span>
-                    </div>
-                </div>
-                <div class="info-row">
-                    <div class="info-item">
-                        <span class="info-value">{student_row['class']}</span>
-                        <span class="info-label">المستوى:</span>
-                    </div>
-                    <div class="info-item">
-                        <span class="info-value">{student_row['section']}</span>
-                        <span class="info-label">الشعبة:</span>
-                    </div>
-                </div>
-            </div>
-            
-            <div class="metrics">
-                <div class="metric">
-                    <div class="metric-value">{int(student_row['total_material_solved'])}</div>
-                    <div class="metric-label">تقييمات منجزة</div>
-                </div>
-                <div class="metric">
-                    <div class="metric-value">{int(student_row.get('remaining', student_row.get('unsolved_assessment_count', 0)))}</div>
-                    <div class="metric-label">تقييمات متبقية</div>
-                </div>
-                <div class="metric">
-                    <div class="metric-value">{int(student_row.get('total_assessments', 0))}</div>
-                    <div class="metric-label">إجمالي التقييمات</div>
-                </div>
-                <div class="metric">
-                    <div class="metric-value">{student_row['solve_pct']:.1f}%</div>
-                    <div class="metric-label">نسبة الإنجاز</div>
-                </div>
-            </div>
-            
-            <div class="category-box" style="background: linear-gradient(135deg, {category_color} 0%, {category_color}dd 100%);">
-                <h2>{student_row['category']}</h2>
-                <p>الفئة</p>
-            </div>
-            
-            <div class="recommendation">
-                <p>💡 {student_row['recommendation']}</p>
-            </div>
-            
-            <div class="unsolved-section">
-                <h3>التقييمات غير المنجزة</h3>
-                <div class="unsolved-list">
-                    <p>{student_row['unsolved_titles']}</p>
-                </div>
-            </div>
-        </div>
-        
-        <div class="footer">
-            <p>تم إنشاء التقرير بواسطة Weekly Assessments Analyzer v3.7</p>
-            <p>{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-        </div>
-    </div>
-</body>
-</html>"""
-    
-    return html
+    return _html_renderer().render(student_row)
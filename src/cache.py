@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .results import RECORD_COLUMNS
+
+# Bump when scoring changes so stale entries are never served
+CACHE_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "weekly-assessments-analyzer")
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024  # 200 MB
+
+# Extra arrays of an entry holding the diagnostics raised while scoring
+_MESSAGE_LEVELS = "_message_levels"
+_MESSAGE_TEXTS = "_message_texts"
+
+
+class ResultCache:
+    """
+    On-disk cache of scored student records.
+
+    Entries are keyed by the SHA-256 of the workbook bytes plus the analyzer
+    settings, stored as compressed columnar .npz files, and evicted least
+    recently used first once the directory grows past max_bytes.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(data: bytes, settings: Dict) -> str:
+        """Build a cache key from workbook content and analyzer settings."""
+        digest = hashlib.sha256(data)
+        digest.update(json.dumps(
+            {"version": CACHE_VERSION, **settings},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str
+        ).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        """Return cached records for key, or None on a miss."""
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[List[Dict], List[Tuple[str, str]]]]:
+        """Return (records, messages) stored for key, or None on a miss."""
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                columns = {name: data[name].tolist() for name in RECORD_COLUMNS}
+                # Entries written without messages have none
+                levels = data[_MESSAGE_LEVELS].tolist() if _MESSAGE_LEVELS in data else []
+                texts = data[_MESSAGE_TEXTS].tolist() if _MESSAGE_TEXTS in data else []
+        except (OSError, KeyError, ValueError):
+            return None
+
+        # Mark as recently used for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        names = list(RECORD_COLUMNS)
+        records = [dict(zip(names, values)) for values in zip(*(columns[name] for name in names))]
+        return records, list(zip(levels, texts))
+
+    def put(self, key: str, records: List[Dict], messages: Optional[List[Tuple[str, str]]] = None):
+        """
+        Store records under key and evict old entries if over the size limit.
+
+        messages are the (level, message) warnings/errors raised while
+        producing the records, replayed by get_entry on a hit.
+        """
+        columns = {
+            name: np.array([record[name] for record in records], dtype=dtype)
+            for name, dtype in RECORD_COLUMNS.items()
+        }
+        messages = messages or []
+        columns[_MESSAGE_LEVELS] = np.array([level for level, _ in messages], dtype=str)
+        columns[_MESSAGE_TEXTS] = np.array([text for _, text in messages], dtype=str)
+
+        # Write to a temporary file first so readers never see partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(f, **columns)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self._evict()
+
+    def _evict(self):
+        """Remove least recently used entries until the cache fits max_bytes."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".npz"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        """Remove every cached entry."""
+        for name in os.listdir(self.directory):
+            if name.endswith(".npz"):
+                os.remove(os.path.join(self.directory, name))
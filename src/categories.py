@@ -0,0 +1,46 @@
+from typing import Dict, List, Union
+
+import numpy as np
+
+
+class CategoryBucketer:
+    """
+    Assigns category labels from lower threshold edges.
+
+    Edges are sorted once at construction; whole arrays are then bucketed
+    with a single np.searchsorted. A value belongs to the category with the
+    highest threshold it reaches. Values below every threshold, and NaN,
+    get the default category.
+    """
+
+    def __init__(self, thresholds: Dict[str, float], default: str):
+        """
+        Args:
+            thresholds: Category -> minimum value (inclusive)
+            default: Category for values below every threshold or NaN
+        """
+        ordered = sorted(thresholds.items(), key=lambda x: x[1])
+        self.edges = np.array([threshold for _, threshold in ordered], dtype=float)
+        self.default = default
+        # Position 0 is the default; position i + 1 is the i-th edge's category
+        self.labels = np.array([default] + [category for category, _ in ordered], dtype=object)
+
+    def codes(self, values) -> np.ndarray:
+        """Index into self.labels for every value."""
+        values = np.asarray(values, dtype=float)
+        positions = np.searchsorted(self.edges, values, side="right")
+        # NaN sorts past every edge, so send it to the default explicitly
+        positions[np.isnan(values)] = 0
+        return positions
+
+    def assign(self, values) -> np.ndarray:
+        """Category label for every value, as an object array."""
+        return self.labels[self.codes(values)]
+
+    def assign_one(self, value: Union[int, float]) -> str:
+        """Category label for a single value."""
+        return self.labels[int(self.codes([value])[0])]
+
+    def categories(self) -> List[str]:
+        """Category labels from the highest threshold down to the default."""
+        return list(dict.fromkeys(self.labels[::-1].tolist()))
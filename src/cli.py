@@ -0,0 +1,209 @@
+"""
+Command-line batch runner.
+
+Analyzes every workbook in the given files/directories and writes the
+combined student results plus one report per subject/level/section:
+
+    python -m src exports/ --output out/ --jobs 4 --html
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from .analyzer import AssessmentAnalyzer
+from .cache import ResultCache
+from .diagnostics import ERROR, CollectingDiagnostics
+from .email_reports import SubjectReportGenerator
+from .html_reports import safe_path_part
+from .profiling import NULL_PROFILER, Profiler
+
+# Exit codes
+EXIT_OK = 0
+EXIT_PARTIAL = 1      # some workbooks failed or reported errors
+EXIT_NO_INPUT = 2     # bad arguments or no workbooks found
+
+WORKBOOK_EXTENSIONS = (".xlsx", ".xls")
+
+
+def find_workbooks(paths: Sequence[str]) -> List[str]:
+    """Workbook files among paths, expanding directories (not recursively), in sorted order."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            names = sorted(os.listdir(path))
+            found.extend(
+                os.path.join(path, name) for name in names
+                if name.lower().endswith(WORKBOOK_EXTENSIONS) and not name.startswith("~$")
+            )
+        elif os.path.isfile(path):
+            found.append(path)
+    return found
+
+
+def _parse_date_arg(value: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"تاريخ غير صالح (المطلوب YYYY-MM-DD): {value}")
+
+
+def _analyze_workbook_task(args) -> Tuple[str, List[Dict], List[Tuple[str, str]], float, List[Dict]]:
+    """Analyze one workbook; returns (path, records, messages, seconds, profiled stages)."""
+    path, settings, workers, cache_dir, profile, trace_memory = args
+    started = time.perf_counter()
+    diagnostics = CollectingDiagnostics()
+    profiler = Profiler(trace_memory=trace_memory) if profile else NULL_PROFILER
+    analyzer = AssessmentAnalyzer(**settings, diagnostics=diagnostics, profiler=profiler)
+    try:
+        sheets = pd.ExcelFile(path).sheet_names
+        cache = ResultCache(cache_dir) if cache_dir else None
+        records = analyzer.analyze_file(path, sheets, workers=workers, cache=cache)
+    except Exception as e:
+        diagnostics.error(f"خطأ في قراءة الملف: {str(e)}")
+        records = []
+    return path, records, diagnostics.messages, time.perf_counter() - started, profiler.stages
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src",
+        description="Analyze weekly assessment workbooks without the web app."
+    )
+    parser.add_argument("inputs", nargs="+", help="Workbook files or directories containing them")
+    parser.add_argument("-o", "--output", required=True, help="Output directory")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Workbooks analyzed in parallel (processes)")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Sheet worker processes per workbook")
+    parser.add_argument("--start-date", type=_parse_date_arg, help="Only count assessments due on/after this date (YYYY-MM-DD)")
+    parser.add_argument("--end-date", type=_parse_date_arg, help="Only count assessments due on/before this date (YYYY-MM-DD)")
+    parser.add_argument("--start-col", default="H", help="Column letter of the first assessment (default H)")
+    parser.add_argument("--names-row", type=int, default=5, help="Row of the first student (default 5)")
+    parser.add_argument("--names-col", default="A", help="Column letter of student names (default A)")
+    parser.add_argument("--due-row", type=int, default=3, help="Row of the due dates (default 3)")
+    parser.add_argument("--cache-dir", help="Reuse results of unchanged workbooks/sheets stored in this directory")
+    parser.add_argument("--html", action="store_true", help="Also write per-student HTML reports")
+    parser.add_argument("--pdf", action="store_true", help="Also write per-section PDF reports")
+    parser.add_argument("--profile", metavar="PATH", help="Write a JSON report of the time, rows/cells and memory of every stage")
+    parser.add_argument("--trace-memory", action="store_true", help="Include peak memory per stage in --profile (slower)")
+    parser.add_argument("--strict", action="store_true", help="Exit with an error code on warnings too")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only print errors")
+    return parser
+
+
+def write_section_reports(results: pd.DataFrame, directory: str) -> List[str]:
+    """Write one text report per subject/level/section; returns the written paths."""
+    paths = []
+    for (subject, level, section), report in SubjectReportGenerator().generate_section_reports(results).items():
+        folder = os.path.join(directory, safe_path_part(subject), safe_path_part(level))
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"{safe_path_part(section)}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(report)
+        paths.append(path)
+    return paths
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if bool(args.start_date) != bool(args.end_date):
+        parser.error("--start-date و --end-date يجب تحديدهما معاً")
+
+    def log(message: str, error: bool = False):
+        if error or not args.quiet:
+            print(message, file=sys.stderr, flush=True)
+
+    workbooks = find_workbooks(args.inputs)
+    if not workbooks:
+        log("لم يتم العثور على ملفات Excel في المسارات المحددة.", error=True)
+        return EXIT_NO_INPUT
+
+    settings = {
+        "start_col_letter": args.start_col,
+        "names_row": args.names_row,
+        "names_col": args.names_col,
+        "due_row": args.due_row,
+        "date_range": (args.start_date, args.end_date) if args.start_date else None,
+    }
+    profile = bool(args.profile)
+    tasks = [(path, settings, max(1, args.workers), args.cache_dir, profile, args.trace_memory) for path in workbooks]
+    profiler = Profiler(trace_memory=args.trace_memory) if profile else NULL_PROFILER
+
+    started = time.perf_counter()
+    frames = []
+    failed = 0
+    warned = 0
+
+    def handle(position: int, result: Tuple[str, List[Dict], List[Tuple[str, str]], float, List[Dict]]):
+        nonlocal failed, warned
+        path, records, messages, seconds, stages = result
+        profiler.add_stages(stages, source=path)
+        errors = [message for level, message in messages if level == ERROR]
+        warnings = [message for level, message in messages if level != ERROR]
+        failed += bool(errors)
+        warned += bool(warnings)
+
+        log(f"[{position}/{len(tasks)}] {path}: {len(records)} سجل، {len(warnings)} تحذير، {len(errors)} خطأ ({seconds:.2f}s)")
+        for message in warnings:
+            log(f"    تحذير: {message}")
+        for message in errors:
+            log(f"    خطأ: {message}", error=True)
+
+        if records:
+            frame = pd.DataFrame(records)
+            frame.insert(0, "source_file", os.path.basename(path))
+            frames.append(frame)
+
+    if args.jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(tasks))) as pool:
+            for position, result in enumerate(pool.map(_analyze_workbook_task, tasks), 1):
+                handle(position, result)
+    else:
+        for position, task in enumerate(tasks, 1):
+            handle(position, _analyze_workbook_task(task))
+
+    os.makedirs(args.output, exist_ok=True)
+    results = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    results_path = os.path.join(args.output, "results.csv")
+    with profiler.stage("write_results", rows=len(results)):
+        # utf-8-sig so Excel opens the Arabic text correctly
+        results.to_csv(results_path, index=False, encoding="utf-8-sig")
+    log(f"النتائج: {results_path} ({len(results)} سجل)")
+
+    if not results.empty:
+        with profiler.stage("section_reports", rows=len(results)):
+            paths = write_section_reports(results, os.path.join(args.output, "section_reports"))
+        log(f"تقارير الشعب: {len(paths)}")
+
+        if args.html:
+            from .html_reports import write_html_reports
+            with profiler.stage("html_reports", rows=len(results)):
+                paths = write_html_reports(results, os.path.join(args.output, "html_reports"))
+            log(f"تقارير HTML: {len(paths)}")
+
+        if args.pdf:
+            from .pdf_reports import write_pdf_reports
+            # Pages are rendered in worker processes when --jobs > 1
+            with profiler.stage("pdf_reports", rows=len(results)):
+                paths = write_pdf_reports(results, os.path.join(args.output, "pdf_reports"), workers=max(1, args.jobs))
+            log(f"تقارير PDF: {len(paths)}")
+
+    log(f"اكتمل خلال {time.perf_counter() - started:.2f}s")
+
+    if profile:
+        with open(args.profile, "w", encoding="utf-8") as f:
+            f.write(profiler.to_json())
+        log(profiler.format_report())
+        log(f"تقرير الأداء: {args.profile}")
+
+    if failed or (args.strict and warned):
+        return EXIT_PARTIAL
+    return EXIT_OK
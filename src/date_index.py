@@ -0,0 +1,83 @@
+from datetime import datetime, date
+from typing import Dict, Hashable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+def _to_day(value: Union[date, datetime]) -> np.datetime64:
+    if isinstance(value, datetime):
+        value = value.date()
+    return np.datetime64(value, "D")
+
+
+class DueDateIndex:
+    """
+    Sorted due-date index with per-row prefix sums along the date axis.
+
+    Assessment columns are ordered by due date and, for every row, the
+    cumulative sum and count of numeric values are stored. Any [start, end]
+    window is then answered with two binary searches and a subtraction,
+    independent of how many assessments fall inside it.
+    """
+
+    def __init__(self, due_dates: Dict[Hashable, Optional[date]], values: pd.DataFrame):
+        """
+        Args:
+            due_dates: Assessment column -> due date (None for undated columns)
+            values: Frame holding the assessment columns (non-numeric cells are ignored)
+        """
+        # One entry per column position: a title repeated within the frame
+        # keeps all its columns, each under the label's due date
+        positions = [
+            position for position, col in enumerate(values.columns)
+            if due_dates.get(col) is not None
+        ]
+        dates = np.array(
+            [_to_day(due_dates[values.columns[position]]) for position in positions],
+            dtype="datetime64[D]"
+        )
+        order = np.argsort(dates, kind="stable")
+        positions = [positions[i] for i in order]
+
+        self.dates = dates[order]
+        self.labels: List[Hashable] = [values.columns[position] for position in positions]
+        self.row_index = values.index
+
+        matrix = values.iloc[:, positions].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+        present = ~np.isnan(matrix)
+
+        n_rows, n_cols = matrix.shape
+        self._sums = np.zeros((n_rows, n_cols + 1))
+        self._counts = np.zeros((n_rows, n_cols + 1), dtype=np.int64)
+        np.cumsum(np.where(present, matrix, 0.0), axis=1, out=self._sums[:, 1:])
+        np.cumsum(present, axis=1, out=self._counts[:, 1:])
+
+    def bounds(self, start_date: Union[date, datetime], end_date: Union[date, datetime]) -> Tuple[int, int]:
+        """Positions [lo, hi) of the sorted columns due within [start_date, end_date]."""
+        lo = int(np.searchsorted(self.dates, _to_day(start_date), side="left"))
+        hi = int(np.searchsorted(self.dates, _to_day(end_date), side="right"))
+        return lo, max(lo, hi)
+
+    def columns(self, start_date: Union[date, datetime], end_date: Union[date, datetime]) -> List[Hashable]:
+        """Assessment columns due within the window, in due-date order (repeated titles once)."""
+        lo, hi = self.bounds(start_date, end_date)
+        return list(dict.fromkeys(self.labels[lo:hi]))
+
+    def window_sum(self, start_date: Union[date, datetime], end_date: Union[date, datetime]) -> np.ndarray:
+        """Per-row sum of values due within the window."""
+        lo, hi = self.bounds(start_date, end_date)
+        return self._sums[:, hi] - self._sums[:, lo]
+
+    def window_count(self, start_date: Union[date, datetime], end_date: Union[date, datetime]) -> np.ndarray:
+        """Per-row number of numeric values due within the window."""
+        lo, hi = self.bounds(start_date, end_date)
+        return self._counts[:, hi] - self._counts[:, lo]
+
+    def window_mean(self, start_date: Union[date, datetime], end_date: Union[date, datetime]) -> pd.Series:
+        """Per-row mean of values due within the window (NaN when a row has none)."""
+        lo, hi = self.bounds(start_date, end_date)
+        sums = self._sums[:, hi] - self._sums[:, lo]
+        counts = self._counts[:, hi] - self._counts[:, lo]
+        means = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+        return pd.Series(means, index=self.row_index)
@@ -0,0 +1,217 @@
+import re
+from datetime import datetime, date
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# Arabic (Gulf, Levantine and Maghrebi) month names
+ARABIC_MONTHS = {
+    "يناير": 1, "كانون الثاني": 1, "جانفي": 1,
+    "فبراير": 2, "شباط": 2, "فيفري": 2,
+    "مارس": 3, "اذار": 3, "آذار": 3,
+    "ابريل": 4, "أبريل": 4, "نيسان": 4, "افريل": 4,
+    "مايو": 5, "ماي": 5, "ايار": 5, "أيار": 5,
+    "يونيو": 6, "يونيه": 6, "حزيران": 6, "جوان": 6,
+    "يوليو": 7, "يوليه": 7, "تموز": 7, "جويلية": 7,
+    "اغسطس": 8, "أغسطس": 8, "اب": 8, "آب": 8, "اوت": 8,
+    "سبتمبر": 9, "ايلول": 9, "أيلول": 9, "سيبتمبر": 9,
+    "اكتوبر": 10, "أكتوبر": 10, "تشرين الاول": 10, "تشرين الأول": 10,
+    "نوفمبر": 11, "تشرين الثاني": 11, "نونبر": 11,
+    "ديسمبر": 12, "كانون الاول": 12, "كانون الأول": 12, "دجنبر": 12,
+}
+
+# Maximum number of distinct raw cell values kept by the parse cache
+DATE_CACHE_SIZE = 4096
+
+# Day 0 of Excel serial dates
+EXCEL_EPOCH = pd.Timestamp("1899-12-30")
+
+_ARABIC_DIGITS = str.maketrans("٠١٢٣٤٥٦٧٨٩", "0123456789")
+_HAMZA_FORMS = str.maketrans({"أ": "ا", "إ": "ا", "آ": "ا", "ـ": ""})
+
+# يدعم الترتيبين: "2 أكتوبر" و"أكتوبر 2"
+_PATTERN_DAY_FIRST = re.compile(r"(\d{1,2})\s*[-/\s]*\s*([^\d\s]+)")
+_PATTERN_MONTH_FIRST = re.compile(r"([^\d\s]+)\s*[-/\s]*\s*(\d{1,2})")
+
+
+def normalize_arabic_digits(text: str) -> str:
+    """Convert Arabic-Indic digits (٠-٩) to ASCII digits (0-9)."""
+    if not isinstance(text, str):
+        return str(text)
+    return text.translate(_ARABIC_DIGITS)
+
+
+def normalize_hamza(text: str) -> str:
+    """Unify hamza forms of alef and drop tatweel."""
+    return text.translate(_HAMZA_FORMS)
+
+
+# Month lookup by hamza-normalized name; the first spelling listed wins
+_NORMALIZED_MONTHS = {}
+for _name, _month in ARABIC_MONTHS.items():
+    _NORMALIZED_MONTHS.setdefault(normalize_hamza(_name), _month)
+
+
+def excel_serial_to_date(serial: float) -> date:
+    """Convert an Excel serial day number to a date."""
+    return (EXCEL_EPOCH + pd.to_timedelta(float(serial), unit="D")).date()
+
+
+def _parse_text(s: str, year: int) -> Optional[date]:
+    """Parse an Arabic/English date string; year is used when none is given."""
+    s = s.strip()
+    if not s:
+        return None
+    s = normalize_arabic_digits(s)
+
+    m = _PATTERN_DAY_FIRST.search(s) or _PATTERN_MONTH_FIRST.search(s)
+    if m:
+        try:
+            # تحديد الترتيب
+            if _PATTERN_DAY_FIRST.fullmatch(m.group(0)):
+                day = int(m.group(1))
+                month_name = m.group(2).strip()
+            else:
+                month_name = m.group(1).strip()
+                day = int(m.group(2))
+
+            month = ARABIC_MONTHS.get(month_name) or _NORMALIZED_MONTHS.get(normalize_hamza(month_name))
+            if month:
+                # Clamp day to 28 to be safe
+                return date(year, month, min(day, 28))
+        except Exception:
+            pass
+
+    # Fallback to pandas
+    try:
+        parsed = pd.to_datetime(s, dayfirst=True, errors="coerce")
+        if pd.notna(parsed):
+            return parsed.date()
+    except Exception:
+        pass
+
+    return None
+
+
+def _parse_value(date_obj, year: int) -> Optional[date]:
+    """Parse a single non-empty cell value."""
+    # Pandas/Datetime
+    if isinstance(date_obj, datetime):
+        return date_obj.date()
+
+    # Excel serial number
+    if isinstance(date_obj, (int, float)):
+        try:
+            return excel_serial_to_date(date_obj)
+        except Exception:
+            return None
+
+    if isinstance(date_obj, str):
+        return _parse_text(date_obj, year)
+
+    return None
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE, typed=True)
+def _parse_value_cached(date_obj, year: int) -> Optional[date]:
+    return _parse_value(date_obj, year)
+
+
+def parse_date(date_obj) -> Optional[date]:
+    """
+    Parse various date formats (Arabic/English/Excel serial) to date.
+
+    Results are cached by raw cell value, so due-date strings repeated
+    across sheets are only parsed once. Strings without a year use the
+    current year.
+    """
+    # Empty
+    try:
+        if pd.isna(date_obj):
+            return None
+    except Exception:
+        pass
+
+    year = date.today().year
+    try:
+        return _parse_value_cached(date_obj, year)
+    except TypeError:
+        # Unhashable cell value
+        return _parse_value(date_obj, year)
+
+
+def parse_dates(values: Union[Sequence, pd.Series]) -> np.ndarray:
+    """
+    Parse a whole row of due-date cells at once.
+
+    Datetime cells and Excel serial numbers are converted in bulk; only the
+    remaining string cells go through the (cached) Arabic parser. Returns an
+    object array holding a date or None for every input cell.
+    """
+    values = pd.Series(values, dtype=object).to_numpy(dtype=object)
+    result = np.full(len(values), None, dtype=object)
+    if len(values) == 0:
+        return result
+
+    empty = pd.isna(values)
+    is_datetime = np.fromiter((isinstance(v, datetime) for v in values), dtype=bool, count=len(values))
+    is_number = np.fromiter((isinstance(v, (int, float)) for v in values), dtype=bool, count=len(values))
+    is_datetime &= ~empty
+    is_number &= ~empty & ~is_datetime
+
+    # Datetime cells
+    if is_datetime.any():
+        try:
+            result[is_datetime] = pd.DatetimeIndex(values[is_datetime]).date
+        except Exception:
+            result[is_datetime] = [parse_date(v) for v in values[is_datetime]]
+
+    # Excel serial numbers
+    if is_number.any():
+        try:
+            serials = values[is_number].astype(float)
+            result[is_number] = (EXCEL_EPOCH + pd.to_timedelta(serials, unit="D")).date
+        except Exception:
+            result[is_number] = [parse_date(v) for v in values[is_number]]
+
+    # Strings and anything else fall back to the scalar parser
+    rest = ~empty & ~is_datetime & ~is_number
+    if rest.any():
+        result[rest] = [parse_date(v) for v in values[rest]]
+
+    return result
+
+
+def normalize_date_range(
+    date_range: Optional[Tuple[Union[date, datetime], Union[date, datetime]]]
+) -> Tuple[Optional[date], Optional[date]]:
+    """Convert a (start, end) range of dates/datetimes to ordered dates."""
+    start_date_raw, end_date_raw = date_range
+    start_date = start_date_raw.date() if isinstance(start_date_raw, datetime) else start_date_raw
+    end_date = end_date_raw.date() if isinstance(end_date_raw, datetime) else end_date_raw
+    if start_date and end_date and start_date > end_date:
+        start_date, end_date = end_date, start_date
+    return start_date, end_date
+
+
+def date_range_mask(
+    due_dates: np.ndarray,
+    date_range: Optional[Tuple[Union[date, datetime], Union[date, datetime]]]
+) -> np.ndarray:
+    """
+    Boolean mask of due dates inside date_range (inclusive).
+
+    Without a range every column passes; with one, columns without a due
+    date are excluded.
+    """
+    if not date_range:
+        return np.ones(len(due_dates), dtype=bool)
+
+    days = np.array(list(due_dates), dtype="datetime64[D]")
+    mask = ~np.isnat(days)
+    start_date, end_date = normalize_date_range(date_range)
+    if start_date and end_date:
+        mask &= (days >= np.datetime64(start_date, "D")) & (days <= np.datetime64(end_date, "D"))
+    return mask
@@ -0,0 +1,72 @@
+import logging
+from typing import Callable, List, Tuple
+
+# Diagnostic levels, named after the matching Streamlit calls
+WARNING = "warning"
+ERROR = "error"
+
+
+class Diagnostics:
+    """
+    Sink for analyzer warnings and errors.
+
+    The analyzer only calls report(level, message); subclasses decide where
+    messages go (Streamlit, logging, a list, a callback).
+    """
+
+    def report(self, level: str, message: str):
+        raise NotImplementedError
+
+    def warning(self, message: str):
+        self.report(WARNING, message)
+
+    def error(self, message: str):
+        self.report(ERROR, message)
+
+
+class StreamlitDiagnostics(Diagnostics):
+    """Shows messages with st.warning / st.error."""
+
+    def report(self, level: str, message: str):
+        import streamlit as st
+        getattr(st, level)(message)
+
+
+class LoggingDiagnostics(Diagnostics):
+    """Writes messages to a logger."""
+
+    def __init__(self, logger_name: str = "src.analyzer"):
+        self.logger_name = logger_name
+
+    def report(self, level: str, message: str):
+        logger = logging.getLogger(self.logger_name)
+        logger.log(logging.ERROR if level == ERROR else logging.WARNING, message)
+
+
+class CollectingDiagnostics(Diagnostics):
+    """Keeps messages as (level, message) pairs, e.g. to pass them between processes."""
+
+    def __init__(self):
+        self.messages: List[Tuple[str, str]] = []
+
+    def report(self, level: str, message: str):
+        self.messages.append((level, message))
+
+    @property
+    def errors(self) -> List[str]:
+        return [message for level, message in self.messages if level == ERROR]
+
+    @property
+    def warnings(self) -> List[str]:
+        return [message for level, message in self.messages if level == WARNING]
+
+
+class CallbackDiagnostics(Diagnostics):
+    """Forwards messages to a callable taking (level, message)."""
+
+    def __init__(self, callback: Callable[[str, str], None]):
+        self.callback = callback
+
+    def report(self, level: str, message: str):
+        self.callback(level, message)
+
@@ -1,5 +1,9 @@
 import smtplib
+import threading
+import time
+import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
@@ -26,19 +30,85 @@ class SubjectReportGenerator:
         """Generate a descriptive report for a subject"""
         
         df = pd.DataFrame(students_data)
+        groups, details = self._classify_students(df)
+        return self._build_report(subject, level, section, df['solve_pct'].mean(), len(df), groups, details, np.arange(len(df)))
+    
+    def generate_section_reports(self, results: pd.DataFrame) -> Dict[Tuple[str, str, str], str]:
+        """
+        Generate the report of every subject/level/section in a results frame.
         
-        # Calculate statistics
-        total_students = len(df)
-        avg_solve_pct = df['solve_pct'].mean()
+        Students are classified and their lines formatted once for the whole
+        frame; each section then only selects its rows, so all reports come
+        out of one grouped pass.
         
-        # Categorize students
-        high_performers = df[df['solve_pct'] >= 90]
-        good_performers = df[(df['solve_pct'] >= 70) & (df['solve_pct'] < 90)]
-        inactive_students = df[(df['solve_pct'] >= CRITICAL_THRESHOLD) & (df['solve_pct'] < PERFORMANCE_THRESHOLD)]
-        critical_students = df[df['solve_pct'] < CRITICAL_THRESHOLD]
+        Args:
+            results: Frame of analyze_file records
+        
+        Returns:
+            (subject, level, section) -> report text, in order of first appearance
+        """
+        groups, details = self._classify_students(results)
+        solve_pct = results['solve_pct'].to_numpy(dtype=float)
+        
+        reports = {}
+        sections = results.groupby(['subject', 'class', 'section'], sort=False).indices
+        # Row positions of every section, ordered by the section's first row
+        for (subject, level, section), positions in sorted(sections.items(), key=lambda item: item[1][0]):
+            reports[(subject, level, section)] = self._build_report(
+                subject, level, section,
+                pd.Series(solve_pct[positions]).mean(), len(positions),
+                groups, details, positions
+            )
+        return reports
+    
+    def _classify_students(self, df: pd.DataFrame) -> Tuple[np.ndarray, List[str]]:
+        """
+        Performance group of every student (0 high, 1 good, 2 inactive,
+        3 critical, -1 none) and their formatted statistics lines.
+        """
+        solve_pct = df['solve_pct'].to_numpy(dtype=float)
+        groups = np.select(
+            [
+                solve_pct >= 90,
+                (solve_pct >= 70) & (solve_pct < 90),
+                (solve_pct >= CRITICAL_THRESHOLD) & (solve_pct < PERFORMANCE_THRESHOLD),
+                solve_pct < CRITICAL_THRESHOLD,
+            ],
+            [0, 1, 2, 3],
+            default=-1
+        )
+        
+        def column(*names) -> List[int]:
+            for name in names:
+                if name in df.columns:
+                    return df[name].astype(int).tolist()
+            return [0] * len(df)
+        
+        remaining = column('remaining', 'unsolved_assessment_count')
+        total = column('total_assessments', 'total')
+        solved = column('total_material_solved', 'solved')
+        details = [
+            f"{name}\n      النسبة: {pct:.2f}% | منجز: {s} | متبقي: {r} | إجمالي: {t}\n"
+            for name, pct, s, r, t in zip(df['student_name'].tolist(), solve_pct.tolist(), solved, remaining, total)
+        ]
+        return groups, details
+    
+    def _build_report(
+        self,
+        subject: str,
+        level: str,
+        section: str,
+        avg_solve_pct: float,
+        total_students: int,
+        groups: np.ndarray,
+        details: List[str],
+        positions: np.ndarray
+    ) -> str:
+        """Assemble one section's report from the rows at positions."""
+        section_groups = groups[positions]
+        high, good, inactive, critical = [positions[section_groups == group] for group in range(4)]
         
-        # Generate report
-        report = f"""
+        parts = [f"""
 ╔══════════════════════════════════════════════════════════════╗
 ║           تقرير تحليل التقييمات الأسبوعية                   ║
 ║        WEEKLY ASSESSMENT ANALYSIS REPORT                      ║
@@ -55,139 +125,164 @@ class SubjectReportGenerator:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 عدد الطلاب الكلي:       {total_students} طالب/طالبة
 متوسط نسبة الإنجاز:     {avg_solve_pct:.2f}%
-عدد الطلاب المتميزين:   {len(high_performers)} (≥ 90%)
-عدد الطلاب الجيدين:     {len(good_performers)} (70% - 89%)
-عدد الطلاب غير الفاعلين: {len(inactive_students)} (50% - 69%)
-عدد الطلاب في الخطر:    {len(critical_students)} (< 50%)
+عدد الطلاب المتميزين:   {len(high)} (≥ 90%)
+عدد الطلاب الجيدين:     {len(good)} (70% - 89%)
+عدد الطلاب غير الفاعلين: {len(inactive)} (50% - 69%)
+عدد الطلاب في الخطر:    {len(critical)} (< 50%)
 
 🎯 الأداء التحليلي:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-✨ الطلاب المتميزون ({len(high_performers)}):
-"""
+✨ الطلاب المتميزون ({len(high)}):
+"""]
         
-        if len(high_performers) > 0:
-            report += self._format_student_list(high_performers, "⭐")
+        if len(high) > 0:
+            parts.append(self._format_student_list(details, high, "⭐"))
         else:
-            report += "   لا يوجد طلاب متميزون حالياً\n"
+            parts.append("   لا يوجد طلاب متميزون حالياً\n")
         
-        report += f"""
-✅ الطلاب الجيدون ({len(good_performers)}):
-"""
-        if len(good_performers) > 0:
-            report += self._format_student_list(good_performers, "✓")
+        parts.append(f"""
+✅ الطلاب الجيدون ({len(good)}):
+""")
+        if len(good) > 0:
+            parts.append(self._format_student_list(details, good, "✓"))
         else:
-            report += "   لا يوجد طلاب بأداء جيد\n"
+            parts.append("   لا يوجد طلاب بأداء جيد\n")
         
-        report += f"""
-⚠️ الطلاب غير الفاعلين - يحتاجون متابعة ({len(inactive_students)}):
-"""
-        if len(inactive_students) > 0:
-            report += self._format_student_list(inactive_students, "⚠")
-            report += self._generate_inactive_actions(inactive_students)
+        parts.append(f"""
+⚠️ الطلاب غير الفاعلين - يحتاجون متابعة ({len(inactive)}):
+""")
+        if len(inactive) > 0:
+            parts.append(self._format_student_list(details, inactive, "⚠"))
+            parts.append(self._generate_inactive_actions())
         else:
-            report += "   لا يوجد طلاب في هذه الفئة (جيد!)\n"
+            parts.append("   لا يوجد طلاب في هذه الفئة (جيد!)\n")
         
-        report += f"""
-🔴 الطلاب في الخطر الشديد - متابعة فورية ({len(critical_students)}):
-"""
-        if len(critical_students) > 0:
-            report += self._format_student_list(critical_students, "🔴")
-            report += self._generate_critical_actions(critical_students)
+        parts.append(f"""
+🔴 الطلاب في الخطر الشديد - متابعة فورية ({len(critical)}):
+""")
+        if len(critical) > 0:
+            parts.append(self._format_student_list(details, critical, "🔴"))
+            parts.append(self._generate_critical_actions())
         else:
-            report += "   لا يوجد طلاب في وضع حرج (ممتاز!)\n"
+            parts.append("   لا يوجد طلاب في وضع حرج (ممتاز!)\n")
         
-        report += f"""
+        parts.append(f"""
 📝 التوصيات:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-"""
-        report += self._generate_recommendations(df, high_performers, good_performers, inactive_students, critical_students)
+""")
+        parts.append(self._generate_recommendations(total_students, len(high), len(good), len(inactive), len(critical)))
         
-        report += f"""
+        parts.append(f"""
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 تم إنشاء التقرير بواسطة: Weekly Assessments Analyzer v3.7
 التاريخ: {self.now.strftime('%Y-%m-%d %H:%M:%S')}
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-"""
+""")
         
-        return report
+        return "".join(parts)
     
-    def _format_student_list(self, students_df: pd.DataFrame, icon: str) -> str:
+    def _format_student_list(self, details: List[str], positions: np.ndarray, icon: str) -> str:
         """Format student list with statistics"""
-        result = ""
-        for idx, (_, student) in enumerate(students_df.iterrows(), 1):
-            remaining_val = int(student.get('remaining', student.get('unsolved_assessment_count', 0)))
-            total_val = int(student.get('total_assessments', student.get('total', 0)))
-            solved_val = int(student.get('total_material_solved', student.get('solved', 0)))
-            result += f"""   {icon} {idx}. {student['student_name']}
-      النسبة: {student['solve_pct']:.2f}% | منجز: {solved_val} | متبقي: {remaining_val} | إجمالي: {total_val}
-"""
-        return result
+        return "".join(
+            f"   {icon} {idx}. {details[position]}"
+            for idx, position in enumerate(positions.tolist(), 1)
+        )
     
-    def _generate_inactive_actions(self, students_df: pd.DataFrame) -> str:
+    def _generate_inactive_actions(self) -> str:
         """Generate action items for inactive students"""
-        actions = "\n   الإجراءات المقترحة:\n"
-        actions += "   • التواصل مع الطالب/الطالبة للتذكير\n"
-        actions += "   • تقديم دعم إضافي في التقييمات\n"
-        actions += "   • متابعة أسباب التأخر\n"
-        actions += "   • التشاور مع ولي الأمر إذا لزم\n"
-        return actions
+        return (
+            "\n   الإجراءات المقترحة:\n"
+            "   • التواصل مع الطالب/الطالبة للتذكير\n"
+            "   • تقديم دعم إضافي في التقييمات\n"
+            "   • متابعة أسباب التأخر\n"
+            "   • التشاور مع ولي الأمر إذا لزم\n"
+        )
     
-    def _generate_critical_actions(self, students_df: pd.DataFrame) -> str:
+    def _generate_critical_actions(self) -> str:
         """Generate action items for critical students"""
-        actions = "\n   الإجراءات المقترحة (فورية):\n"
-        actions += "   • اتصال فوري مع الطالب/الطالبة وولي الأمر\n"
-        actions += "   • جلسة تقوية فورية\n"
-        actions += "   • تحديد أسباب الضعف\n"
-        actions += "   • خطة دعم شاملة\n"
-        actions += "   • متابعة يومية\n"
-        return actions
+        return (
+            "\n   الإجراءات المقترحة (فورية):\n"
+            "   • اتصال فوري مع الطالب/الطالبة وولي الأمر\n"
+            "   • جلسة تقوية فورية\n"
+            "   • تحديد أسباب الضعف\n"
+            "   • خطة دعم شاملة\n"
+            "   • متابعة يومية\n"
+        )
     
     def _generate_recommendations(
         self,
-        all_students: pd.DataFrame,
-        high: pd.DataFrame,
-        good: pd.DataFrame,
-        inactive: pd.DataFrame,
-        critical: pd.DataFrame
+        total: int,
+        high: int,
+        good: int,
+        inactive: int,
+        critical: int
     ) -> str:
-        """Generate general recommendations"""
-        recommendations = ""
+        """Generate general recommendations from the student counts of each group"""
+        parts = []
         
         # Overall assessment
-        total = len(all_students)
-        positive_percent = ((len(high) + len(good)) / total * 100) if total > 0 else 0
+        positive_percent = ((high + good) / total * 100) if total > 0 else 0
         
-        recommendations += f"1. الأداء العام للفصل: {positive_percent:.1f}% أداء إيجابي\n"
+        parts.append(f"1. الأداء العام للفصل: {positive_percent:.1f}% أداء إيجابي\n")
         
-        if len(critical) > 0:
-            recommendations += f"\n2. ⚠️ تنبيه: يوجد {len(critical)} طالب/ة في وضع حرج\n"
-            recommendations += "   يجب إجراء متابعة فورية ومكثفة\n"
+        if critical > 0:
+            parts.append(f"\n2. ⚠️ تنبيه: يوجد {critical} طالب/ة في وضع حرج\n")
+            parts.append("   يجب إجراء متابعة فورية ومكثفة\n")
         
-        if len(inactive) > 0:
-            recommendations += f"\n3. متابعة: يوجد {len(inactive)} طالب/ة بحاجة إلى تحفيز\n"
-            recommendations += "   يفضل جلسات دعم تعليمي\n"
+        if inactive > 0:
+            parts.append(f"\n3. متابعة: يوجد {inactive} طالب/ة بحاجة إلى تحفيز\n")
+            parts.append("   يفضل جلسات دعم تعليمي\n")
         
         if positive_percent >= 80:
-            recommendations += "\n4. ✅ الأداء العام ممتاز، استمر على هذا النهج\n"
+            parts.append("\n4. ✅ الأداء العام ممتاز، استمر على هذا النهج\n")
         elif positive_percent >= 60:
-            recommendations += "\n4. 📈 الأداء جيد، هناك مجال للتحسن\n"
+            parts.append("\n4. 📈 الأداء جيد، هناك مجال للتحسن\n")
         else:
-            recommendations += "\n4. 🔴 الأداء يحتاج تحسين فوري\n"
+            parts.append("\n4. 🔴 الأداء يحتاج تحسين فوري\n")
         
-        recommendations += "\n5. الخطوات القادمة:\n"
-        recommendations += "   • متابعة دورية أسبوعية\n"
-        recommendations += "   • جلسات تعزيز للطلاب المتميزين\n"
-        recommendations += "   • برامج دعم للطلاب الضعفاء\n"
-        recommendations += "   • تواصل منتظم مع أولياء الأمور\n"
+        parts.append(
+            "\n5. الخطوات القادمة:\n"
+            "   • متابعة دورية أسبوعية\n"
+            "   • جلسات تعزيز للطلاب المتميزين\n"
+            "   • برامج دعم للطلاب الضعفاء\n"
+            "   • تواصل منتظم مع أولياء الأمور\n"
+        )
         
-        return recommendations
+        return "".join(parts)
+
+
+class _RateLimiter:
+    """Spaces calls evenly so no more than max_per_minute pass per minute."""
+    
+    def __init__(self, max_per_minute: Optional[float]):
+        self.interval = 60.0 / max_per_minute if max_per_minute else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+    
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
 
 
 class EmailSender:
     """Send emails with reports"""
     
-    def __init__(self, smtp_server: str, smtp_port: int, sender_email: str, sender_password: str):
+    def __init__(
+        self,
+        smtp_server: str,
+        smtp_port: int,
+        sender_email: str,
+        sender_password: str,
+        use_tls: bool = True,
+        timeout: float = 30
+    ):
         """
         Initialize email sender
         
@@ -195,12 +290,62 @@ class EmailSender:
             smtp_server: SMTP server address
             smtp_port: SMTP port (usually 587 for TLS)
             sender_email: Sender email address
-            sender_password: Sender password or app password
+            sender_password: Sender password or app password (empty to skip login)
+            use_tls: Upgrade the connection with STARTTLS (disable only for local test servers)
+            timeout: Socket timeout in seconds
         """
         self.smtp_server = smtp_server
         self.smtp_port = smtp_port
         self.sender_email = sender_email
         self.sender_password = sender_password
+        self.use_tls = use_tls
+        self.timeout = timeout
+    
+    def _connect(self) -> smtplib.SMTP:
+        """Open an SMTP connection, upgraded to TLS and logged in."""
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.sender_password:
+                server.login(self.sender_email, self.sender_password)
+        except Exception:
+            server.close()
+            raise
+        return server
+    
+    def _build_message(
+        self,
+        teacher_email: str,
+        subject: str,
+        level: str,
+        section: str,
+        report_content: str,
+        inactive_students: List[Dict],
+        critical_students: List[Dict]
+    ) -> MIMEMultipart:
+        """Build the plain text + HTML report message."""
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = f"تقرير التقييمات الأسبوعية - {subject} ({level}/{section})"
+        msg['From'] = self.sender_email
+        msg['To'] = teacher_email
+        
+        # Create HTML version of report
+        html_report = self._convert_to_html(
+            report_content,
+            subject,
+            level,
+            section,
+            inactive_students,
+            critical_students
+        )
+        
+        # Attach parts
+        part1 = MIMEText(report_content, 'plain', 'utf-8')
+        part2 = MIMEText(html_report, 'html', 'utf-8')
+        msg.attach(part1)
+        msg.attach(part2)
+        return msg
     
     def send_subject_report(
         self,
@@ -215,32 +360,13 @@ class EmailSender:
         """Send subject report to teacher"""
         
         try:
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = f"تقرير التقييمات الأسبوعية - {subject} ({level}/{section})"
-            msg['From'] = self.sender_email
-            msg['To'] = teacher_email
-            
-            # Create HTML version of report
-            html_report = self._convert_to_html(
-                report_content,
-                subject,
-                level,
-                section,
-                inactive_students,
-                critical_students
+            msg = self._build_message(
+                teacher_email, subject, level, section,
+                report_content, inactive_students, critical_students
             )
             
-            # Attach parts
-            part1 = MIMEText(report_content, 'plain', 'utf-8')
-            part2 = MIMEText(html_report, 'html', 'utf-8')
-            msg.attach(part1)
-            msg.attach(part2)
-            
             # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender_email, self.sender_password)
+            with self._connect() as server:
                 server.send_message(msg)
             
             return True, "تم إرسال التقرير بنجاح"
@@ -248,6 +374,100 @@ class EmailSender:
         except Exception as e:
             return False, f"خطأ في الإرسال: {str(e)}"
     
+    def send_reports_batch(
+        self,
+        reports: List[Dict],
+        max_workers: int = 4,
+        max_per_minute: Optional[float] = None,
+        max_messages_per_connection: int = 100
+    ) -> List[Dict]:
+        """
+        Send many subject reports over a small pool of reused connections.
+        
+        Each worker thread keeps one logged-in SMTP connection and sends its
+        share of the messages over it, reconnecting after
+        max_messages_per_connection messages or when the server drops it.
+        
+        Args:
+            reports: Dicts with the arguments of send_subject_report
+                (teacher_email, subject, level, section, report_content,
+                inactive_students, critical_students)
+            max_workers: Number of concurrent connections
+            max_per_minute: Overall sending rate cap (None for no cap)
+            max_messages_per_connection: Messages sent before a connection is renewed
+        
+        Returns:
+            One result per report, in input order: teacher_email, subject,
+            level, section, success and message
+        """
+        limiter = _RateLimiter(max_per_minute)
+        local = threading.local()
+        connections = []
+        connections_lock = threading.Lock()
+        
+        def get_connection() -> smtplib.SMTP:
+            server = getattr(local, "server", None)
+            if server is not None and local.sent >= max_messages_per_connection:
+                self._close(server)
+                server = None
+            if server is None:
+                server = self._connect()
+                local.server = server
+                local.sent = 0
+                with connections_lock:
+                    connections.append(server)
+            return server
+        
+        def drop_connection():
+            server = getattr(local, "server", None)
+            if server is not None:
+                self._close(server)
+                local.server = None
+        
+        def send_one(report: Dict) -> Dict:
+            result = {
+                "teacher_email": report.get("teacher_email"),
+                "subject": report.get("subject"),
+                "level": report.get("level"),
+                "section": report.get("section"),
+            }
+            try:
+                msg = self._build_message(
+                    report["teacher_email"], report["subject"], report["level"], report["section"],
+                    report["report_content"], report.get("inactive_students", []),
+                    report.get("critical_students", [])
+                )
+                limiter.wait()
+                try:
+                    get_connection().send_message(msg)
+                except smtplib.SMTPServerDisconnected:
+                    # Reused connection timed out; retry once on a fresh one
+                    drop_connection()
+                    get_connection().send_message(msg)
+                local.sent += 1
+                result.update(success=True, message="تم إرسال التقرير بنجاح")
+            except Exception as e:
+                # Connection-level failures leave the socket unusable; refused
+                # recipients or data do not
+                if isinstance(e, OSError) and not isinstance(e, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused)):
+                    drop_connection()
+                result.update(success=False, message=f"خطأ في الإرسال: {str(e)}")
+            return result
+        
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(reports) or 1))) as pool:
+                return list(pool.map(send_one, reports))
+        finally:
+            for server in connections:
+                self._close(server)
+    
+    @staticmethod
+    def _close(server: smtplib.SMTP):
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+    
     def _convert_to_html(
         self,
         text_report: str,
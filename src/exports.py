@@ -0,0 +1,145 @@
+import os
+import tempfile
+import threading
+import weakref
+import zipfile
+from typing import BinaryIO, Optional
+
+import pandas as pd
+
+from .html_reports import REPORT_CSS, STYLESHEET_NAME, HTMLReportRenderer, report_filename, safe_path_part
+
+# Archive folders are subject/level/section, so pages sit three levels below the root
+_ARCHIVE_DEPTH = 3
+
+
+def report_archive_path(position: int, student_row: dict, extension: str = "html") -> str:
+    """Path of a student's report inside the archive: subject/level/section/file."""
+    return "/".join([
+        safe_path_part(student_row["subject"]),
+        safe_path_part(student_row["class"]),
+        safe_path_part(student_row["section"]),
+        report_filename(position, student_row["student_name"], extension),
+    ])
+
+
+class ReportZipExport:
+    """
+    Background export of every student report into one ZIP archive.
+
+    Pages are rendered one at a time and written straight into a temporary
+    ZIP file on disk, so memory use does not grow with the number of
+    students. The export runs on a daemon thread; poll done/progress and
+    hand open() to st.download_button once it has finished.
+
+    The archive is deleted by cleanup(), which also stops a running export,
+    or otherwise once the export object is garbage collected (e.g. with the
+    session state holding it) or the interpreter exits.
+    """
+
+    def __init__(self, results: pd.DataFrame, link_stylesheet: bool = True, directory: Optional[str] = None):
+        """
+        Args:
+            results: Frame of analyze_file records
+            link_stylesheet: Store report.css once at the archive root and link
+                it from every page instead of inlining it
+            directory: Where to create the archive (system temp dir by default)
+        """
+        self.results = results
+        self.link_stylesheet = link_stylesheet
+        self.total = len(results)
+        self.completed = 0
+        self.error: Optional[Exception] = None
+
+        fd, self.path = tempfile.mkstemp(suffix=".zip", dir=directory)
+        os.close(fd)
+        # Does not reference self, so it also runs when the export is collected
+        self._remove_archive = weakref.finalize(self, _remove_file, self.path)
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> "ReportZipExport":
+        with self._lock:
+            if self._cancelled.is_set():
+                return self
+            self._running = True
+        self._thread.start()
+        return self
+
+    @property
+    def done(self) -> bool:
+        return self._thread.ident is not None and not self._thread.is_alive()
+
+    @property
+    def succeeded(self) -> bool:
+        return self.done and self.error is None and not self._cancelled.is_set()
+
+    @property
+    def progress(self) -> float:
+        """Fraction of reports written so far (0.0 - 1.0)."""
+        return self.completed / self.total if self.total else 1.0
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the export finishes; returns True when it has."""
+        self._thread.join(timeout)
+        return self.done
+
+    def _run(self):
+        try:
+            stylesheet_href = "../" * _ARCHIVE_DEPTH + STYLESHEET_NAME if self.link_stylesheet else None
+            renderer = HTMLReportRenderer(stylesheet_href)
+
+            with zipfile.ZipFile(self.path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+                # No records (e.g. no sheet had assessment titles): empty archive
+                if self.results.empty:
+                    return
+                rows = self.results[["student_name", "subject", "class", "section"]].to_dict("records")
+                if self.link_stylesheet:
+                    zf.writestr(STYLESHEET_NAME, REPORT_CSS)
+                for position, html in enumerate(renderer.render_frame(self.results)):
+                    if self._cancelled.is_set():
+                        break
+                    zf.writestr(report_archive_path(position, rows[position]), html)
+                    self.completed = position + 1
+        except Exception as e:
+            self.error = e
+        finally:
+            with self._lock:
+                self._running = False
+                cancelled = self._cancelled.is_set()
+            # cleanup() was called while the archive was still open
+            if cancelled:
+                self._remove_archive()
+
+    def open(self) -> BinaryIO:
+        """Open the finished archive for reading."""
+        if not self.succeeded:
+            raise RuntimeError("export has not finished successfully")
+        return open(self.path, "rb")
+
+    def cleanup(self):
+        """
+        Delete the archive file. A running export is stopped and deletes
+        the file itself once it has closed it.
+        """
+        with self._lock:
+            self._cancelled.set()
+            running = self._running
+        if not running:
+            self._remove_archive()
+
+
+def _remove_file(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def start_report_zip_export(
+    results: pd.DataFrame,
+    link_stylesheet: bool = True,
+    directory: Optional[str] = None
+) -> ReportZipExport:
+    """Start exporting every student report into a ZIP archive on a background thread."""
+    return ReportZipExport(results, link_stylesheet, directory).start()
@@ -0,0 +1,432 @@
+import os
+import re
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+# Shared report stylesheet, inlined in every page or written once as a file
+REPORT_CSS = """        * {
+            margin: 0;
+            padding: 0;
+            box-sizing: border-box;
+        }
+        
+        body {
+            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif, 'Arial';
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            padding: 20px;
+            direction: rtl;
+            text-align: right;
+        }
+        
+        .container {
+            max-width: 900px;
+            margin: 0 auto;
+            background: white;
+            border-radius: 10px;
+            box-shadow: 0 10px 40px rgba(0, 0, 0, 0.3);
+            overflow: hidden;
+        }
+        
+        .header {
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            padding: 40px;
+            text-align: center;
+        }
+        
+        .header h1 {
+            font-size: 2.5em;
+            margin-bottom: 10px;
+        }
+        
+        .header p {
+            font-size: 1.1em;
+            opacity: 0.9;
+        }
+        
+        .content {
+            padding: 40px;
+        }
+        
+        .student-info {
+            background: #f5f5f5;
+            padding: 20px;
+            border-radius: 8px;
+            margin-bottom: 30px;
+            border-right: 4px solid #667eea;
+        }
+        
+        .info-row {
+            display: grid;
+            grid-template-columns: 1fr 1fr;
+            gap: 20px;
+            margin-bottom: 15px;
+        }
+        
+        .info-item {
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+        }
+        
+        .info-label {
+            font-weight: bold;
+            color: #333;
+            margin-left: 10px;
+        }
+        
+        .info-value {
+            color: #666;
+            font-size: 1.1em;
+        }
+        
+        .category-box {
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            padding: 20px;
+            border-radius: 8px;
+            text-align: center;
+            margin: 30px 0;
+        }
+        
+        .category-box h2 {
+            font-size: 2em;
+            margin-bottom: 10px;
+        }
+        
+        .category-box p {
+            font-size: 1.1em;
+            opacity: 0.95;
+        }
+        
+        .recommendation {
+            background: #e8f5e9;
+            border-right: 4px solid #4caf50;
+            padding: 20px;
+            border-radius: 4px;
+            margin: 20px 0;
+            direction: rtl;
+            text-align: right;
+        }
+        
+        .recommendation p {
+            color: #2e7d32;
+            font-size: 1.1em;
+            line-height: 1.6;
+        }
+        
+        .metrics {
+            display: grid;
+            grid-template-columns: repeat(4, 1fr);
+            gap: 15px;
+            margin: 30px 0;
+        }
+        
+        .metric {
+            background: #f9f9f9;
+            padding: 15px;
+            border-radius: 8px;
+            text-align: center;
+            border-top: 3px solid #667eea;
+        }
+        
+        .metric-value {
+            font-size: 2em;
+            font-weight: bold;
+            color: #667eea;
+        }
+        
+        .metric-label {
+            font-size: 0.9em;
+            color: #666;
+            margin-top: 5px;
+        }
+        
+        .unsolved-section {
+            margin: 30px 0;
+        }
+        
+        .unsolved-section h3 {
+            color: #333;
+            margin-bottom: 15px;
+            font-size: 1.3em;
+            border-bottom: 2px solid #667eea;
+            padding-bottom: 10px;
+        }
+        
+        .unsolved-list {
+            background: #fff3e0;
+            padding: 15px;
+            border-radius: 8px;
+        }
+        
+        .unsolved-list p {
+            color: #e65100;
+            line-height: 1.6;
+        }
+        
+        .footer {
+            background: #f5f5f5;
+            padding: 20px;
+            text-align: center;
+            color: #999;
+            font-size: 0.9em;
+            margin-top: 30px;
+            border-top: 1px solid #ddd;
+        }
+        
+        @media print {
+            body {
+                background: white;
+            }
+            .container {
+                box-shadow: none;
+                max-width: 100%;
+            }
+            .header {
+                page-break-after: avoid;
+            }
+        }
+"""
+
+CATEGORY_COLORS = {
+    "البلاتينية": "#f093fb",
+    "الذهبي": "#ffd89b",
+    "الفضي": "#a8edea",
+    "البرونزي": "#ff9a56",
+    "تحتاج إلى تحسين": "#ff6b6b"
+}
+DEFAULT_CATEGORY_COLOR = "#667eea"
+
+STYLESHEET_NAME = "report.css"
+
+# Page skeleton; {style} is filled once per renderer, the rest per student
+_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html dir="rtl" lang="ar">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>تقرير الطالب - {student_name}</title>
+{style}</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>تقرير الطالب</h1>
+            <p>Weekly Assessment Report</p>
+        </div>
+        
+        <div class="content">
+            <div class="student-info">
+                <div class="info-row">
+                    <div class="info-item">
+                        <span class="info-value">{student_name}</span>
+                        <span class="info-label">اسم الطالب:</span>
+                    </div>
+                    <div class="info-item">
+                        <span class="info-value">{subject}</span>
+                        <span class="info-label">المادة:</span>
+                    </div>
+                </div>
+                <div class="info-row">
+                    <div class="info-item">
+                        <span class="info-value">{class}</span>
+                        <span class="info-label">المستوى:</span>
+                    </div>
+                    <div class="info-item">
+                        <span class="info-value">{section}</span>
+                        <span class="info-label">الشعبة:</span>
+                    </div>
+                </div>
+            </div>
+            
+            <div class="metrics">
+                <div class="metric">
+                    <div class="metric-value">{total_material_solved}</div>
+                    <div class="metric-label">تقييمات منجزة</div>
+                </div>
+                <div class="metric">
+                    <div class="metric-value">{remaining}</div>
+                    <div class="metric-label">تقييمات متبقية</div>
+                </div>
+                <div class="metric">
+                    <div class="metric-value">{total_assessments}</div>
+                    <div class="metric-label">إجمالي التقييمات</div>
+                </div>
+                <div class="metric">
+                    <div class="metric-value">{solve_pct:.1f}%</div>
+                    <div class="metric-label">نسبة الإنجاز</div>
+                </div>
+            </div>
+            
+            <div class="category-box" style="background: linear-gradient(135deg, {category_color} 0%, {category_color}dd 100%);">
+                <h2>{category}</h2>
+                <p>الفئة</p>
+            </div>
+            
+            <div class="recommendation">
+                <p>💡 {recommendation}</p>
+            </div>
+            
+            <div class="unsolved-section">
+                <h3>التقييمات غير المنجزة</h3>
+                <div class="unsolved-list">
+                    <p>{unsolved_titles}</p>
+                </div>
+            </div>
+        </div>
+        
+        <div class="footer">
+            <p>تم إنشاء التقرير بواسطة Weekly Assessments Analyzer v3.7</p>
+            <p>{generated_at}</p>
+        </div>
+    </div>
+</body>
+</html>"""
+
+_UNSAFE_FILENAME_CHARS = re.compile(r'[\\/:*?"<>|\s]+')
+
+
+def _style_block(stylesheet_href: Optional[str]) -> str:
+    if stylesheet_href is None:
+        return f"    <style>\n{REPORT_CSS}    </style>\n"
+    return f'    <link rel="stylesheet" href="{stylesheet_href}">\n'
+
+
+class HTMLReportRenderer:
+    """
+    Renders student HTML reports from a template compiled once.
+
+    The page skeleton and stylesheet are assembled when the renderer is
+    created, so each student only costs one format call. With
+    stylesheet_href set, pages link that stylesheet instead of inlining
+    REPORT_CSS.
+    """
+
+    def __init__(self, stylesheet_href: Optional[str] = None):
+        """
+        Args:
+            stylesheet_href: Stylesheet URL to link from every page; None inlines the CSS
+        """
+        self.stylesheet_href = stylesheet_href
+        style = _style_block(stylesheet_href).replace("{", "{{").replace("}", "}}")
+        self._template = _PAGE_TEMPLATE.replace("{style}", style)
+
+    def _render_fields(self, fields: Dict) -> str:
+        fields["category_color"] = CATEGORY_COLORS.get(fields["category"], DEFAULT_CATEGORY_COLOR)
+        return self._template.format_map(fields)
+
+    def render(self, student_row: pd.Series, generated_at: Optional[str] = None) -> str:
+        """Render the report of one student row."""
+        fields = student_fields(student_row)
+        fields["generated_at"] = generated_at or now_timestamp()
+        return self._render_fields(fields)
+
+    def render_frame(self, results: pd.DataFrame, generated_at: Optional[str] = None) -> Iterator[str]:
+        """
+        Render one report per row of a results frame, lazily and in row order.
+
+        All pages of a batch share one generated_at timestamp.
+        """
+        generated_at = generated_at or now_timestamp()
+        for fields in frame_fields(results):
+            fields["generated_at"] = generated_at
+            yield self._render_fields(fields)
+
+
+def now_timestamp() -> str:
+    """Report footer timestamp."""
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def student_fields(student_row: pd.Series) -> Dict:
+    """Report fields of one student row."""
+    return {
+        "student_name": student_row["student_name"],
+        "subject": student_row["subject"],
+        "class": student_row["class"],
+        "section": student_row["section"],
+        "total_material_solved": int(student_row["total_material_solved"]),
+        "remaining": int(student_row.get("remaining", student_row.get("unsolved_assessment_count", 0))),
+        "total_assessments": int(student_row.get("total_assessments", 0)),
+        "solve_pct": student_row["solve_pct"],
+        "category": student_row["category"],
+        "recommendation": student_row["recommendation"],
+        "unsolved_titles": student_row["unsolved_titles"],
+    }
+
+
+def frame_fields(results: pd.DataFrame) -> Iterator[Dict]:
+    """Report fields of every row of a results frame, read column-wise."""
+    if "remaining" in results.columns:
+        remaining = results["remaining"]
+    elif "unsolved_assessment_count" in results.columns:
+        remaining = results["unsolved_assessment_count"]
+    else:
+        remaining = pd.Series(0, index=results.index)
+    total = results["total_assessments"] if "total_assessments" in results.columns else pd.Series(0, index=results.index)
+
+    columns = zip(
+        results["student_name"].tolist(),
+        results["subject"].tolist(),
+        results["class"].tolist(),
+        results["section"].tolist(),
+        results["total_material_solved"].astype(int).tolist(),
+        remaining.astype(int).tolist(),
+        total.astype(int).tolist(),
+        results["solve_pct"].tolist(),
+        results["category"].tolist(),
+        results["recommendation"].tolist(),
+        results["unsolved_titles"].tolist(),
+    )
+    keys = (
+        "student_name", "subject", "class", "section", "total_material_solved", "remaining",
+        "total_assessments", "solve_pct", "category", "recommendation", "unsolved_titles"
+    )
+    for values in columns:
+        yield dict(zip(keys, values))
+
+
+def safe_path_part(text, fallback: str = "_") -> str:
+    """Text usable as a single file or folder name."""
+    return _UNSAFE_FILENAME_CHARS.sub("_", str(text)).strip("_.") or fallback
+
+
+def report_filename(position: int, student_name: str, extension: str = "html") -> str:
+    """File name for the report at a given row position."""
+    return f"{position + 1:04d}_{safe_path_part(student_name, 'student')}.{extension}"
+
+
+def write_html_reports(
+    results: pd.DataFrame,
+    directory: str,
+    link_stylesheet: bool = True,
+    generated_at: Optional[str] = None
+) -> List[str]:
+    """
+    Write one HTML report per student into directory.
+
+    Args:
+        results: Frame of analyze_file records
+        directory: Output directory (created if missing)
+        link_stylesheet: Write REPORT_CSS once as report.css and link it from
+            every page instead of inlining it
+
+    Returns:
+        Paths of the written reports, in row order
+    """
+    os.makedirs(directory, exist_ok=True)
+    renderer = HTMLReportRenderer(STYLESHEET_NAME if link_stylesheet else None)
+    if link_stylesheet:
+        with open(os.path.join(directory, STYLESHEET_NAME), "w", encoding="utf-8") as f:
+            f.write(REPORT_CSS)
+
+    paths = []
+    names = results["student_name"].tolist()
+    for position, html in enumerate(renderer.render_frame(results, generated_at)):
+        path = os.path.join(directory, report_filename(position, names[position]))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html)
+        paths.append(path)
+    return paths
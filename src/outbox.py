@@ -0,0 +1,288 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from .email_reports import EmailSender
+
+DEFAULT_OUTBOX_PATH = os.path.join(os.path.expanduser("~"), ".cache", "weekly-assessments-analyzer", "outbox.sqlite3")
+
+# Message states
+STATUS_PENDING = "pending"
+STATUS_SENDING = "sending"
+STATUS_SENT = "sent"
+STATUS_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    teacher_email TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    sent_at REAL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+"""
+
+_STATUS_COLUMNS = "idempotency_key, teacher_email, status, attempts, next_attempt_at, last_error, created_at, updated_at, sent_at"
+
+
+def _json_default(value):
+    # numpy scalars from analyzer records
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def make_idempotency_key(report: Dict) -> str:
+    """Key identifying a report email by its content, so enqueuing it twice sends it once."""
+    payload = json.dumps(report, sort_keys=True, ensure_ascii=False, default=_json_default)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class EmailOutbox:
+    """
+    Persistent SQLite outbox for report emails.
+
+    enqueue() only writes to the local database and returns at once; a
+    background worker drains due messages through EmailSender.send_reports_batch
+    and retries failures with exponential backoff until max_attempts.
+    Messages are identified by idempotency keys, so enqueuing the same report
+    again does not send it twice. Delivery is at least once: a message that
+    was being sent when the process died is sent again on restart.
+    """
+
+    def __init__(
+        self,
+        sender: EmailSender,
+        path: str = DEFAULT_OUTBOX_PATH,
+        max_attempts: int = 5,
+        base_delay: float = 30,
+        max_delay: float = 3600,
+        batch_size: int = 50,
+        max_workers: int = 4,
+        max_per_minute: Optional[float] = None,
+        poll_interval: float = 2
+    ):
+        """
+        Args:
+            sender: EmailSender used for delivery
+            path: SQLite database file
+            max_attempts: Attempts before a message is marked failed
+            base_delay: Seconds before the first retry; doubles on every further attempt
+            max_delay: Upper bound of the retry delay in seconds
+            batch_size: Messages claimed per delivery round
+            max_workers: Concurrent SMTP connections per round
+            max_per_minute: Sending rate cap (None for no cap)
+            poll_interval: Seconds the worker sleeps when nothing is due
+        """
+        self.sender = sender
+        self.path = path
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.max_per_minute = max_per_minute
+        self.poll_interval = poll_interval
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as db:
+            # WAL lets the UI read statuses while the worker writes
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection that commits on success, rolls back on error and is always closed."""
+        db = sqlite3.connect(self.path, timeout=30)
+        db.row_factory = sqlite3.Row
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def retry_delay(self, attempts: int) -> float:
+        """Seconds to wait after the given number of failed attempts."""
+        return min(self.max_delay, self.base_delay * 2 ** max(0, attempts - 1))
+
+    def enqueue(self, report: Dict, idempotency_key: Optional[str] = None) -> str:
+        """
+        Add a report email to the outbox.
+
+        Args:
+            report: Arguments of EmailSender.send_subject_report
+            idempotency_key: Caller-chosen key; derived from the report content when None
+
+        Returns:
+            The idempotency key; enqueuing an existing key is a no-op
+        """
+        return self.enqueue_many([report], [idempotency_key])[0]
+
+    def enqueue_many(self, reports: List[Dict], idempotency_keys: Optional[List[Optional[str]]] = None) -> List[str]:
+        """Add several report emails in one transaction; returns their idempotency keys."""
+        keys = idempotency_keys or [None] * len(reports)
+        now = time.time()
+        rows = []
+        result = []
+        for report, key in zip(reports, keys):
+            key = key or make_idempotency_key(report)
+            result.append(key)
+            rows.append((
+                key,
+                report["teacher_email"],
+                json.dumps(report, ensure_ascii=False, default=_json_default),
+                STATUS_PENDING,
+                now, now, now
+            ))
+
+        with self._connect() as db:
+            db.executemany(
+                "INSERT OR IGNORE INTO outbox "
+                "(idempotency_key, teacher_email, payload, status, next_attempt_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        self._wake.set()
+        return result
+
+    def _claim_due(self) -> List[sqlite3.Row]:
+        """Mark up to batch_size due messages as sending and return them."""
+        now = time.time()
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            rows = db.execute(
+                "SELECT id, idempotency_key, payload, attempts FROM outbox "
+                "WHERE status = ? AND next_attempt_at <= ? ORDER BY next_attempt_at, id LIMIT ?",
+                (STATUS_PENDING, now, self.batch_size)
+            ).fetchall()
+            db.executemany(
+                "UPDATE outbox SET status = ?, updated_at = ? WHERE id = ?",
+                [(STATUS_SENDING, now, row["id"]) for row in rows]
+            )
+        return rows
+
+    def process_once(self) -> int:
+        """Send one round of due messages; returns how many were attempted."""
+        rows = self._claim_due()
+        if not rows:
+            return 0
+
+        reports = [json.loads(row["payload"]) for row in rows]
+        results = self.sender.send_reports_batch(
+            reports,
+            max_workers=self.max_workers,
+            max_per_minute=self.max_per_minute
+        )
+
+        now = time.time()
+        updates = []
+        for row, result in zip(rows, results):
+            attempts = row["attempts"] + 1
+            if result["success"]:
+                updates.append((STATUS_SENT, attempts, now, None, now, now, row["id"]))
+            elif attempts >= self.max_attempts:
+                updates.append((STATUS_FAILED, attempts, now, result["message"], now, None, row["id"]))
+            else:
+                updates.append((STATUS_PENDING, attempts, now + self.retry_delay(attempts), result["message"], now, None, row["id"]))
+
+        with self._connect() as db:
+            db.executemany(
+                "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ?, "
+                "updated_at = ?, sent_at = ? WHERE id = ?",
+                updates
+            )
+        return len(rows)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                attempted = self.process_once()
+            except Exception:
+                attempted = 0
+            if not attempted:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def start(self) -> "EmailOutbox":
+        """Start the background worker (no-op if it is already running)."""
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        # Messages left mid-send by a previous process are due again
+        with self._connect() as db:
+            db.execute(
+                "UPDATE outbox SET status = ?, updated_at = ? WHERE status = ?",
+                (STATUS_PENDING, time.time(), STATUS_SENDING)
+            )
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the background worker after its current round."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def status(self, idempotency_key: str) -> Optional[Dict]:
+        """Delivery state of one message, or None if the key is unknown."""
+        with self._connect() as db:
+            row = db.execute(
+                f"SELECT {_STATUS_COLUMNS} FROM outbox WHERE idempotency_key = ?",
+                (idempotency_key,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def statuses(self, status: Optional[str] = None, limit: int = 1000) -> List[Dict]:
+        """Delivery state of the most recent messages, optionally of one status."""
+        query = f"SELECT {_STATUS_COLUMNS} FROM outbox"
+        params: tuple = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status,)
+        query += " ORDER BY id DESC LIMIT ?"
+        with self._connect() as db:
+            rows = db.execute(query, params + (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def summary(self) -> Dict[str, int]:
+        """Number of messages per status."""
+        counts = {STATUS_PENDING: 0, STATUS_SENDING: 0, STATUS_SENT: 0, STATUS_FAILED: 0}
+        with self._connect() as db:
+            for row in db.execute("SELECT status, COUNT(*) AS n FROM outbox GROUP BY status"):
+                counts[row["status"]] = row["n"]
+        return counts
+
+    def retry_failed(self) -> int:
+        """Queue failed messages again with a fresh attempt budget; returns how many."""
+        now = time.time()
+        with self._connect() as db:
+            cursor = db.execute(
+                "UPDATE outbox SET status = ?, attempts = 0, next_attempt_at = ?, updated_at = ? WHERE status = ?",
+                (STATUS_PENDING, now, now, STATUS_FAILED)
+            )
+        self._wake.set()
+        return cursor.rowcount
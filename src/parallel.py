@@ -0,0 +1,109 @@
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+# Workbook opened once in each worker process (see _init_worker)
+_worker_xls: Optional[pd.ExcelFile] = None
+
+
+def read_file_bytes(file_obj) -> bytes:
+    """Return the raw bytes of an uploaded file, file-like object or path."""
+    if hasattr(file_obj, "getvalue"):
+        return file_obj.getvalue()
+    if hasattr(file_obj, "read"):
+        position = file_obj.tell()
+        file_obj.seek(0)
+        data = file_obj.read()
+        file_obj.seek(position)
+        return data
+    with open(file_obj, "rb") as f:
+        return f.read()
+
+
+def _init_worker(data: bytes):
+    """Open the workbook once per worker process."""
+    global _worker_xls
+    _worker_xls = pd.ExcelFile(BytesIO(data))
+
+
+def _analyze_sheet_task(args) -> Tuple[str, Optional[str], Optional[List[Dict]], List[Tuple[str, str]]]:
+    """
+    Parse and score one sheet inside a worker process.
+
+    Records are None when the sheet's fingerprint matches the known one, so
+    the parent can reuse its earlier result.
+    """
+    analyzer, sheet_name, used_range_only, known_fingerprint = args
+    if sheet_name not in _worker_xls.sheet_names:
+        return sheet_name, None, [], []
+
+    df = analyzer.parse_sheet(_worker_xls, sheet_name, used_range_only)
+    fingerprint = analyzer.sheet_fingerprint(df, sheet_name)
+    if fingerprint == known_fingerprint:
+        return sheet_name, fingerprint, None, []
+
+    # Streamlit is not available in workers, so keep messages for the parent
+    records, messages = analyzer._analyze_sheet_tracked(df, sheet_name)
+    return sheet_name, fingerprint, records, messages
+
+
+def _parse_sheet_task(sheet_name: str) -> Union[pd.DataFrame, Exception]:
+    """Read one sheet without headers inside a worker process."""
+    try:
+        return _worker_xls.parse(sheet_name, header=None)
+    except Exception as e:
+        return e
+
+
+def _make_pool(data: bytes, workers: int, n_tasks: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=max(1, min(workers, n_tasks)),
+        initializer=_init_worker,
+        initargs=(data,)
+    )
+
+
+def analyze_sheets_parallel(
+    analyzer,
+    file_obj,
+    sheets: List[str],
+    workers: int,
+    used_range_only: bool = False,
+    known_fingerprints: Optional[Dict[str, str]] = None
+) -> List[Tuple[str, Optional[str], Optional[List[Dict]], List[Tuple[str, str]]]]:
+    """
+    Analyze sheets in a process pool.
+
+    Returns (sheet_name, fingerprint, records, messages) per sheet in the
+    order of `sheets`, where messages are the (level, message) warnings/errors
+    raised while analyzing it. Records are None for sheets whose fingerprint
+    equals the one in known_fingerprints.
+    """
+    data = read_file_bytes(file_obj)
+    known_fingerprints = known_fingerprints or {}
+    tasks = [
+        (analyzer, sheet_name, used_range_only, known_fingerprints.get(sheet_name))
+        for sheet_name in sheets
+    ]
+
+    with _make_pool(data, workers, len(tasks)) as pool:
+        return list(pool.map(_analyze_sheet_task, tasks))
+
+
+def parse_sheets_parallel(
+    file_obj,
+    sheets: List[str],
+    workers: int
+) -> Dict[str, Union[pd.DataFrame, Exception]]:
+    """
+    Read sheets without headers in a process pool.
+
+    Each sheet maps to its DataFrame, or to the exception raised while
+    reading it so the caller can report it per sheet.
+    """
+    data = read_file_bytes(file_obj)
+
+    with _make_pool(data, workers, len(sheets)) as pool:
+        return dict(zip(sheets, pool.map(_parse_sheet_task, sheets)))
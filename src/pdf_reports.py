@@ -0,0 +1,340 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+
+import arabic_reshaper
+import pandas as pd
+from bidi.algorithm import get_display
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from .html_reports import (
+    CATEGORY_COLORS, DEFAULT_CATEGORY_COLOR, frame_fields, now_timestamp,
+    report_filename, safe_path_part, student_fields
+)
+
+# Environment variable pointing at a TTF font with Arabic glyphs
+FONT_ENV_VAR = "REPORT_PDF_FONT"
+
+# Fonts with Arabic glyphs, tried in order when FONT_ENV_VAR is not set
+FONT_CANDIDATES = [
+    "/usr/share/fonts/truetype/noto/NotoNaskhArabic-Regular.ttf",
+    "/usr/share/fonts/truetype/noto/NotoSansArabic-Regular.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+    "C:\\Windows\\Fonts\\arial.ttf",
+    "C:\\Windows\\Fonts\\tahoma.ttf",
+    "/System/Library/Fonts/Supplemental/Arial.ttf",
+    "/Library/Fonts/Arial Unicode.ttf",
+]
+
+FONT_NAME = "ReportArabic"
+BOLD_FONT_NAME = "ReportArabic-Bold"
+
+PAGE_WIDTH, PAGE_HEIGHT = A4
+MARGIN = 40
+
+PRIMARY_COLOR = colors.HexColor("#667eea")
+TEXT_COLOR = colors.HexColor("#333333")
+MUTED_COLOR = colors.HexColor("#666666")
+
+# Fonts registered in this process, keyed by regular font path
+_registered_fonts: Dict[str, Tuple[str, str]] = {}
+
+
+def find_font() -> str:
+    """Path of a TTF font that can render Arabic text."""
+    path = os.environ.get(FONT_ENV_VAR)
+    if path:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"الخط المحدد في {FONT_ENV_VAR} غير موجود: {path}")
+        return path
+    for path in FONT_CANDIDATES:
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"لم أجد خطاً يدعم العربية؛ حدد مسار ملف TTF في {FONT_ENV_VAR}.")
+
+
+def _bold_variant(path: str) -> Optional[str]:
+    root, ext = os.path.splitext(path)
+    candidates = [
+        root.replace("-Regular", "-Bold") + ext,
+        root + "-Bold" + ext,
+        root + "bd" + ext,
+    ]
+    for candidate in candidates:
+        if candidate != path and os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def register_fonts(font_path: Optional[str] = None) -> Tuple[str, str]:
+    """Register the report fonts once per process; returns (regular, bold) font names."""
+    font_path = font_path or find_font()
+    if font_path in _registered_fonts:
+        return _registered_fonts[font_path]
+
+    suffix = str(len(_registered_fonts))
+    regular = FONT_NAME + suffix
+    pdfmetrics.registerFont(TTFont(regular, font_path))
+    bold_path = _bold_variant(font_path)
+    bold = regular
+    if bold_path:
+        bold = BOLD_FONT_NAME + suffix
+        pdfmetrics.registerFont(TTFont(bold, bold_path))
+
+    _registered_fonts[font_path] = (regular, bold)
+    return regular, bold
+
+
+# One reshaper instance; the module-level arabic_reshaper.reshape re-reads its config on every call
+_RESHAPER = arabic_reshaper.ArabicReshaper()
+
+
+@lru_cache(maxsize=8192)
+def _shape_cached(text: str) -> str:
+    return get_display(_RESHAPER.reshape(text))
+
+
+def shape(text) -> str:
+    """Join Arabic letter forms and reorder for right-to-left display."""
+    return _shape_cached(str(text))
+
+
+def _wrap(text: str, font: str, size: float, width: float, max_lines: int) -> List[str]:
+    """Split logical text into shaped lines that fit width."""
+    # Letters only join within a word, so a line is as wide as its shaped words plus spaces
+    space = pdfmetrics.stringWidth(" ", font, size)
+    lines = []
+    current = []
+    current_width = 0.0
+    for word in str(text).split():
+        word_width = pdfmetrics.stringWidth(shape(word), font, size)
+        if current and current_width + space + word_width > width:
+            lines.append(" ".join(current))
+            current = [word]
+            current_width = word_width
+        else:
+            current_width += (space if current else 0.0) + word_width
+            current.append(word)
+    if current:
+        lines.append(" ".join(current))
+
+    if len(lines) > max_lines:
+        lines = lines[:max_lines]
+        lines[-1] += " …"
+    return [shape(line) for line in lines]
+
+
+class PDFReportRenderer:
+    """
+    Renders student reports as A4 PDF pages with the content of the HTML
+    report, using a TTF font with Arabic glyphs and bidi-reordered text.
+    """
+
+    def __init__(self, font_path: Optional[str] = None):
+        """
+        Args:
+            font_path: TTF font to use; found with find_font() when None
+        """
+        self.font, self.bold_font = register_fonts(font_path)
+
+    def _draw_text(self, c, text, x, y, size, font=None, color=TEXT_COLOR, align="right"):
+        c.setFont(font or self.font, size)
+        c.setFillColor(color)
+        shaped = shape(text)
+        if align == "right":
+            c.drawRightString(x, y, shaped)
+        elif align == "center":
+            c.drawCentredString(x, y, shaped)
+        else:
+            c.drawString(x, y, shaped)
+
+    def draw_page(self, c: canvas.Canvas, fields: Dict):
+        """Draw one student's report on the current page."""
+        right = PAGE_WIDTH - MARGIN
+        width = PAGE_WIDTH - 2 * MARGIN
+        y = PAGE_HEIGHT - MARGIN
+
+        # Header
+        c.setFillColor(PRIMARY_COLOR)
+        c.roundRect(MARGIN, y - 90, width, 90, 8, fill=1, stroke=0)
+        self._draw_text(c, "تقرير الطالب", PAGE_WIDTH / 2, y - 45, 26, self.bold_font, colors.white, "center")
+        self._draw_text(c, "Weekly Assessment Report", PAGE_WIDTH / 2, y - 70, 12, color=colors.white, align="center")
+        y -= 115
+
+        # Student info, two items per row, first item on the right
+        c.setFillColor(colors.HexColor("#f5f5f5"))
+        c.rect(MARGIN, y - 70, width, 70, fill=1, stroke=0)
+        c.setFillColor(PRIMARY_COLOR)
+        c.rect(right - 4, y - 70, 4, 70, fill=1, stroke=0)
+        items = [
+            [("اسم الطالب:", fields["student_name"]), ("المادة:", fields["subject"])],
+            [("المستوى:", fields["class"]), ("الشعبة:", fields["section"])],
+        ]
+        half = (width - 40) / 2
+        for row_number, row in enumerate(items):
+            row_y = y - 28 - row_number * 28
+            for column, (label, value) in enumerate(row):
+                cell_right = right - 20 - column * (half + 20)
+                self._draw_text(c, label, cell_right, row_y, 12, self.bold_font)
+                self._draw_text(c, value, cell_right - half, row_y, 12, color=MUTED_COLOR, align="left")
+        y -= 95
+
+        # Metrics, first metric on the right
+        metrics = [
+            (str(fields["total_material_solved"]), "تقييمات منجزة"),
+            (str(fields["remaining"]), "تقييمات متبقية"),
+            (str(fields["total_assessments"]), "إجمالي التقييمات"),
+            (f"{fields['solve_pct']:.1f}%", "نسبة الإنجاز"),
+        ]
+        box_width = (width - 3 * 12) / 4
+        for i, (value, label) in enumerate(metrics):
+            box_right = right - i * (box_width + 12)
+            c.setFillColor(colors.HexColor("#f9f9f9"))
+            c.rect(box_right - box_width, y - 70, box_width, 70, fill=1, stroke=0)
+            c.setFillColor(PRIMARY_COLOR)
+            c.rect(box_right - box_width, y - 3, box_width, 3, fill=1, stroke=0)
+            center = box_right - box_width / 2
+            self._draw_text(c, value, center, y - 38, 22, self.bold_font, PRIMARY_COLOR, "center")
+            self._draw_text(c, label, center, y - 58, 10, color=MUTED_COLOR, align="center")
+        y -= 95
+
+        # Category
+        category_color = colors.HexColor(CATEGORY_COLORS.get(fields["category"], DEFAULT_CATEGORY_COLOR))
+        c.setFillColor(category_color)
+        c.roundRect(MARGIN, y - 80, width, 80, 8, fill=1, stroke=0)
+        self._draw_text(c, fields["category"], PAGE_WIDTH / 2, y - 38, 24, self.bold_font, TEXT_COLOR, "center")
+        self._draw_text(c, "الفئة", PAGE_WIDTH / 2, y - 62, 12, color=TEXT_COLOR, align="center")
+        y -= 100
+
+        # Recommendation
+        lines = _wrap(fields["recommendation"], self.font, 12, width - 40, 4)
+        height = 24 + 18 * len(lines)
+        c.setFillColor(colors.HexColor("#e8f5e9"))
+        c.rect(MARGIN, y - height, width, height, fill=1, stroke=0)
+        c.setFillColor(colors.HexColor("#4caf50"))
+        c.rect(right - 4, y - height, 4, height, fill=1, stroke=0)
+        c.setFont(self.font, 12)
+        c.setFillColor(colors.HexColor("#2e7d32"))
+        for i, line in enumerate(lines):
+            c.drawRightString(right - 20, y - 24 - i * 18, line)
+        y -= height + 25
+
+        # Unsolved assessments
+        self._draw_text(c, "التقييمات غير المنجزة", right, y - 14, 15, self.bold_font)
+        c.setStrokeColor(PRIMARY_COLOR)
+        c.setLineWidth(2)
+        c.line(MARGIN, y - 24, right, y - 24)
+        y -= 36
+
+        footer_top = MARGIN + 50
+        max_lines = max(1, int((y - footer_top - 24) // 16))
+        lines = _wrap(fields["unsolved_titles"], self.font, 11, width - 30, max_lines)
+        height = 20 + 16 * len(lines)
+        c.setFillColor(colors.HexColor("#fff3e0"))
+        c.rect(MARGIN, y - height, width, height, fill=1, stroke=0)
+        c.setFont(self.font, 11)
+        c.setFillColor(colors.HexColor("#e65100"))
+        for i, line in enumerate(lines):
+            c.drawRightString(right - 15, y - 20 - i * 16, line)
+
+        # Footer
+        c.setStrokeColor(colors.HexColor("#dddddd"))
+        c.setLineWidth(1)
+        c.line(MARGIN, footer_top, right, footer_top)
+        footer_color = colors.HexColor("#999999")
+        self._draw_text(c, "تم إنشاء التقرير بواسطة Weekly Assessments Analyzer v3.7", PAGE_WIDTH / 2, footer_top - 20, 9, color=footer_color, align="center")
+        self._draw_text(c, fields["generated_at"], PAGE_WIDTH / 2, footer_top - 34, 9, color=footer_color, align="center")
+
+    def write(self, rows: List[Dict], output, title: str = "تقارير الطلاب"):
+        """Write one page per student row into a PDF file path or file object."""
+        c = canvas.Canvas(output, pagesize=A4)
+        c.setTitle(title)
+        for fields in rows:
+            self.draw_page(c, fields)
+            c.showPage()
+        c.save()
+
+    def render(self, student_row: pd.Series, generated_at: Optional[str] = None) -> bytes:
+        """Render the report of one student row as PDF bytes."""
+        fields = student_fields(student_row)
+        fields["generated_at"] = generated_at or now_timestamp()
+        buffer = BytesIO()
+        self.write([fields], buffer, title=f"تقرير الطالب - {fields['student_name']}")
+        return buffer.getvalue()
+
+
+def _render_section_task(args) -> List[str]:
+    """Render the reports of one section, merged or as individual files."""
+    font_path, rows, positions, output, merge = args
+    renderer = PDFReportRenderer(font_path)
+    if merge:
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        renderer.write(rows, output)
+        return [output]
+
+    os.makedirs(output, exist_ok=True)
+    paths = []
+    for position, fields in zip(positions, rows):
+        path = os.path.join(output, report_filename(position, fields["student_name"], "pdf"))
+        renderer.write([fields], path, title=f"تقرير الطالب - {fields['student_name']}")
+        paths.append(path)
+    return paths
+
+
+def write_pdf_reports(
+    results: pd.DataFrame,
+    directory: str,
+    merge_by_section: bool = True,
+    workers: int = 1,
+    font_path: Optional[str] = None,
+    generated_at: Optional[str] = None
+) -> List[str]:
+    """
+    Write the PDF reports of every student, organized by subject/level/section.
+
+    Args:
+        results: Frame of analyze_file records
+        directory: Output directory
+        merge_by_section: One PDF per section (subject/level/section.pdf) with a
+            page per student; otherwise one file per student in
+            subject/level/section/
+        workers: Number of processes; sections are rendered in parallel when > 1
+        font_path: TTF font with Arabic glyphs (see find_font)
+
+    Returns:
+        Paths of the written files, in section order
+    """
+    font_path = font_path or find_font()
+    generated_at = generated_at or now_timestamp()
+
+    # Group rows by section, keeping first-appearance order
+    sections: Dict[Tuple[str, str, str], Tuple[List[Dict], List[int]]] = {}
+    for position, fields in enumerate(frame_fields(results)):
+        fields["generated_at"] = generated_at
+        key = (fields["subject"], fields["class"], fields["section"])
+        rows, positions = sections.setdefault(key, ([], []))
+        rows.append(fields)
+        positions.append(position)
+
+    tasks = []
+    for (subject, level, section), (rows, positions) in sections.items():
+        folder = os.path.join(directory, safe_path_part(subject), safe_path_part(level))
+        section_name = safe_path_part(section)
+        output = os.path.join(folder, f"{section_name}.pdf") if merge_by_section else os.path.join(folder, section_name)
+        tasks.append((font_path, rows, positions, output, merge_by_section))
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            results_paths = list(pool.map(_render_section_task, tasks))
+    else:
+        results_paths = [_render_section_task(task) for task in tasks]
+
+    return [path for paths in results_paths for path in paths]
@@ -0,0 +1,226 @@
+"""
+Stage-level timing and memory instrumentation.
+
+Code under measurement wraps its stages in profiler.stage(...); the
+analyzer and the app use NULL_PROFILER by default, so the instrumentation
+costs nothing unless a Profiler is passed in:
+
+    profiler = Profiler(trace_memory=True)
+    AssessmentAnalyzer(profiler=profiler).analyze_file(path, sheets)
+    print(profiler.format_report())
+"""
+
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+
+class Stage:
+    """One timed stage: wall time, rows/cells processed and peak memory."""
+
+    def __init__(self, name: str, sheet: Optional[str], parent: Optional["Stage"] = None):
+        self.name = name
+        self.sheet = sheet
+        self.parent = parent.name if parent else None
+        # Names of the enclosing stages, e.g. "analyze_file/read_sheet"
+        self.path = f"{parent.path}/{name}" if parent else name
+        self.depth = parent.depth + 1 if parent else 0
+        self.start = 0.0
+        self.seconds = 0.0
+        self.rows: Optional[int] = None
+        self.cells: Optional[int] = None
+        self.peak_bytes: Optional[int] = None
+        # tracemalloc bookkeeping while the stage is open
+        self._start_bytes = 0
+        self._peak = 0
+
+    def count(self, rows: Optional[int] = None, cells: Optional[int] = None):
+        """Set the number of rows and/or cells the stage processed."""
+        if rows is not None:
+            self.rows = int(rows)
+        if cells is not None:
+            self.cells = int(cells)
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "sheet": self.sheet,
+            "parent": self.parent,
+            "path": self.path,
+            "depth": self.depth,
+            "start": self.start,
+            "seconds": self.seconds,
+            "rows": self.rows,
+            "cells": self.cells,
+            "peak_bytes": self.peak_bytes,
+        }
+
+
+class Profiler:
+    """
+    Records the stages of one run.
+
+    Stages nest: a stage opened inside another is recorded under its path
+    (e.g. "analyze_file/read_sheet"), and the parent's time includes it. With trace_memory, tracemalloc
+    runs while the outermost stage is open and every stage records its peak
+    allocation above the memory in use when it started. Tracing slows Python
+    code down noticeably, and allocations made in worker processes are not
+    seen.
+    """
+
+    enabled = True
+
+    def __init__(self, trace_memory: bool = False):
+        """
+        Args:
+            trace_memory: Also record peak memory per stage (uses tracemalloc)
+        """
+        self.trace_memory = trace_memory
+        self.stages: List[Dict] = []
+        self._local = threading.local()
+        self._started_tracing = False
+        self._created = time.perf_counter()
+
+    def _open_stages(self) -> List[Stage]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _fold_peak(self, stack: List[Stage]):
+        """Carry the traced peak so far into every open stage before it is reset."""
+        peak = tracemalloc.get_traced_memory()[1]
+        for stage in stack:
+            stage._peak = max(stage._peak, peak)
+
+    @contextmanager
+    def stage(self, name: str, sheet: Optional[str] = None, rows: Optional[int] = None, cells: Optional[int] = None) -> Iterator[Stage]:
+        """
+        Time a block of code as one stage.
+
+        Args:
+            name: Stage name, e.g. "read_sheet"
+            sheet: Sheet the stage works on (inherited from the enclosing stage when None)
+            rows: Rows processed, if known up front (or set later with Stage.count)
+            cells: Cells processed, if known up front
+        """
+        stack = self._open_stages()
+        parent = stack[-1] if stack else None
+        stage = Stage(name, sheet if sheet is not None else (parent.sheet if parent else None), parent)
+        stage.count(rows, cells)
+
+        tracing = self.trace_memory
+        if tracing:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            self._fold_peak(stack)
+            tracemalloc.reset_peak()
+            stage._start_bytes = tracemalloc.get_traced_memory()[0]
+
+        stack.append(stage)
+        started = time.perf_counter()
+        stage.start = started - self._created
+        try:
+            yield stage
+        finally:
+            stage.seconds = time.perf_counter() - started
+            stack.pop()
+            if tracing:
+                self._fold_peak(stack + [stage])
+                stage.peak_bytes = max(0, stage._peak - stage._start_bytes)
+                if not stack and self._started_tracing:
+                    tracemalloc.stop()
+                    self._started_tracing = False
+            self.stages.append(stage.to_dict())
+
+    def add_stages(self, stages: List[Dict], source: Optional[str] = None):
+        """
+        Add stages recorded elsewhere (e.g. by a profiler in a worker process).
+        Their start offsets are relative to that profiler.
+        """
+        for stage in stages:
+            self.stages.append({**stage, "source": source} if source else dict(stage))
+
+    def _totals(self, key_names: List[str]) -> List[Dict]:
+        """Sum the stages grouped by key_names, in the order the groups were first entered."""
+        totals: Dict[tuple, Dict] = {}
+        for stage in sorted(self.stages, key=lambda stage: stage["start"]):
+            key = tuple(stage[name] for name in key_names)
+            total = totals.get(key)
+            if total is None:
+                total = totals[key] = {name: stage[name] for name in key_names}
+                total.update(name=stage["name"], depth=stage["depth"], calls=0, seconds=0.0, rows=0, cells=0, peak_bytes=None)
+            total["calls"] += 1
+            total["seconds"] += stage["seconds"]
+            total["rows"] += stage["rows"] or 0
+            total["cells"] += stage["cells"] or 0
+            if stage["peak_bytes"] is not None:
+                total["peak_bytes"] = max(total["peak_bytes"] or 0, stage["peak_bytes"])
+        return list(totals.values())
+
+    def summary(self) -> List[Dict]:
+        """Calls, time, rows/cells and peak memory per stage path."""
+        return self._totals(["path"])
+
+    def sheets(self) -> List[Dict]:
+        """Calls, time, rows/cells and peak memory per sheet and stage path."""
+        return self._totals(["sheet", "path"])
+
+    def report(self) -> Dict:
+        """
+        Structured run report: time of the top-level stages, totals per stage
+        and per sheet, and every recorded stage in start order.
+        """
+        return {
+            "total_seconds": sum(stage["seconds"] for stage in self.stages if stage["depth"] == 0),
+            "trace_memory": self.trace_memory,
+            "stages": self.summary(),
+            "sheets": [total for total in self.sheets() if total["sheet"] is not None],
+            "records": sorted(self.stages, key=lambda stage: stage["start"]),
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.report(), indent=indent, ensure_ascii=False)
+
+    def format_report(self) -> str:
+        """Plain-text table of the per-stage totals."""
+        lines = [f"{'stage':<28} {'calls':>6} {'seconds':>9} {'rows':>9} {'cells':>11} {'peak MB':>9}"]
+        for total in self.summary():
+            name = "  " * total["depth"] + total["name"]
+            peak = f"{total['peak_bytes'] / 1e6:9.2f}" if total["peak_bytes"] is not None else f"{'-':>9}"
+            lines.append(
+                f"{name:<28} {total['calls']:>6} {total['seconds']:>9.3f} {total['rows']:>9} {total['cells']:>11} {peak}"
+            )
+        return "\n".join(lines)
+
+
+class _NullStage(Stage):
+    def count(self, rows: Optional[int] = None, cells: Optional[int] = None):
+        pass
+
+
+class NullProfiler(Profiler):
+    """Profiler that records nothing; the default of the analyzer and the app."""
+
+    enabled = False
+
+    def __init__(self):
+        super().__init__(trace_memory=False)
+        self._stage = _NullStage("", None)
+
+    @contextmanager
+    def stage(self, name: str, sheet: Optional[str] = None, rows: Optional[int] = None, cells: Optional[int] = None) -> Iterator[Stage]:
+        yield self._stage
+
+    def add_stages(self, stages: List[Dict], source: Optional[str] = None):
+        pass
+
+    def __reduce__(self):
+        # Unpickles (e.g. in worker processes) as the shared instance
+        return "NULL_PROFILER"
+
+
+NULL_PROFILER = NullProfiler()
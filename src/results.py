@@ -0,0 +1,223 @@
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Student record fields in output order, with their compact column dtype
+RECORD_COLUMNS = {
+    "student_name": str,
+    "class": str,
+    "section": str,
+    "subject": str,
+    "total_material_solved": np.int32,
+    "total_assessments": np.int32,
+    "remaining": np.int32,
+    "unsolved_assessment_count": np.int32,
+    "unsolved_titles": str,
+    "solve_pct": np.float64,
+    "category": str,
+    "recommendation": str,
+}
+
+# Repeated string fields, stored as categorical codes
+DIMENSIONS = ["class", "section", "subject", "category", "recommendation"]
+
+# Integer count fields
+COUNTS = ["total_material_solved", "total_assessments", "remaining"]
+
+
+class StudentResults:
+    """
+    Compact columnar container of student results.
+
+    Repeated strings (class, section, subject, category, recommendation) are
+    categorical codes, counts are int32 arrays, and unsolved assessments are
+    a sparse student × assessment bit matrix in CSR form (row pointers plus
+    column ids into a shared title vocabulary) instead of joined strings.
+    to_frame()/to_records() give back the usual analyze_file layout.
+    """
+
+    def __init__(
+        self,
+        student_names: np.ndarray,
+        dimensions: Dict[str, pd.Categorical],
+        counts: Dict[str, np.ndarray],
+        solve_pct: np.ndarray,
+        titles: List[str],
+        unsolved_indptr: np.ndarray,
+        unsolved_indices: np.ndarray
+    ):
+        self.student_names = student_names
+        self.dimensions = dimensions
+        self.counts = counts
+        self.solve_pct = solve_pct
+        self.titles = titles
+        self.unsolved_indptr = unsolved_indptr
+        self.unsolved_indices = unsolved_indices
+
+    def __len__(self) -> int:
+        return len(self.student_names)
+
+    @classmethod
+    def from_sheet(
+        cls,
+        student_names: Sequence[str],
+        sheet_info: Tuple[str, str, str],
+        counts: Dict[str, np.ndarray],
+        solve_pct: Sequence[float],
+        categories: Sequence[str],
+        recommendations: Sequence[str],
+        titles: Sequence[str],
+        missing: np.ndarray
+    ) -> "StudentResults":
+        """
+        Build results for one sheet.
+
+        Args:
+            student_names: Name per student
+            sheet_info: (subject, level, section) shared by every student
+            counts: total_material_solved/total_assessments/remaining arrays
+            solve_pct: Rounded solve percentage per student
+            categories: Category per student
+            recommendations: Recommendation per student
+            titles: Assessment title per column of missing
+            missing: Boolean students × assessments matrix of unsolved ('M') cells
+        """
+        subject, level, section = sheet_info
+        n = len(student_names)
+        constant = {"class": level, "section": section, "subject": subject}
+
+        dimensions = {
+            name: pd.Categorical.from_codes(np.zeros(n, dtype=np.int8), [value])
+            for name, value in constant.items()
+        }
+        dimensions["category"] = pd.Categorical(list(categories))
+        dimensions["recommendation"] = pd.Categorical(list(recommendations))
+
+        rows, cols = np.nonzero(missing)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+
+        return cls(
+            np.array(student_names, dtype=object),
+            dimensions,
+            {name: np.asarray(counts[name], dtype=np.int32) for name in COUNTS},
+            np.asarray(solve_pct, dtype=np.float64),
+            list(titles),
+            indptr,
+            cols.astype(np.int32)
+        )
+
+    @classmethod
+    def from_records(cls, records: List[Dict]) -> "StudentResults":
+        """Build results from analyze_file records (unsolved titles are split on ', ')."""
+        titles = {}
+        lengths = []
+        indices = []
+        for record in records:
+            unsolved = record["unsolved_titles"]
+            names = unsolved.split(", ") if unsolved and unsolved != "-" else []
+            lengths.append(len(names))
+            indices.extend(titles.setdefault(name, len(titles)) for name in names)
+
+        indptr = np.zeros(len(records) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+
+        return cls(
+            np.array([r["student_name"] for r in records], dtype=object),
+            {name: pd.Categorical([r[name] for r in records]) for name in DIMENSIONS},
+            {name: np.array([r[name] for r in records], dtype=np.int32) for name in COUNTS},
+            np.array([r["solve_pct"] for r in records], dtype=np.float64),
+            list(titles),
+            indptr,
+            np.array(indices, dtype=np.int32)
+        )
+
+    @classmethod
+    def concat(cls, parts: List["StudentResults"]) -> "StudentResults":
+        """Combine several results containers, merging their title vocabularies."""
+        if not parts:
+            return cls.from_records([])
+
+        vocabulary = {}
+        indices = []
+        indptr = [np.zeros(1, dtype=np.int64)]
+        offset = 0
+        for part in parts:
+            mapping = np.array(
+                [vocabulary.setdefault(title, len(vocabulary)) for title in part.titles],
+                dtype=np.int32
+            )
+            indices.append(mapping[part.unsolved_indices] if len(mapping) else part.unsolved_indices)
+            indptr.append(part.unsolved_indptr[1:] + offset)
+            offset += part.unsolved_indptr[-1]
+
+        return cls(
+            np.concatenate([part.student_names for part in parts]),
+            {
+                name: union_categoricals([part.dimensions[name] for part in parts])
+                for name in DIMENSIONS
+            },
+            {name: np.concatenate([part.counts[name] for part in parts]) for name in COUNTS},
+            np.concatenate([part.solve_pct for part in parts]),
+            list(vocabulary),
+            np.concatenate(indptr),
+            np.concatenate(indices).astype(np.int32)
+        )
+
+    def unsolved_counts(self) -> np.ndarray:
+        """Number of unsolved assessments per student."""
+        return np.diff(self.unsolved_indptr)
+
+    def unsolved_titles(self, row: int) -> List[str]:
+        """Titles of the assessments a student has not solved."""
+        start, end = self.unsolved_indptr[row], self.unsolved_indptr[row + 1]
+        return [self.titles[i] for i in self.unsolved_indices[start:end]]
+
+    def students_missing(self, title: str) -> np.ndarray:
+        """Boolean mask of students who have not solved the given assessment."""
+        mask = np.zeros(len(self), dtype=bool)
+        if title not in self.titles:
+            return mask
+        rows = np.repeat(np.arange(len(self)), self.unsolved_counts())
+        mask[rows[self.unsolved_indices == self.titles.index(title)]] = True
+        return mask
+
+    def _joined_titles(self) -> List[str]:
+        titles = np.array(self.titles, dtype=object)
+        indptr = self.unsolved_indptr.tolist()
+        return [
+            ", ".join(titles[self.unsolved_indices[start:end]]) if end > start else "-"
+            for start, end in zip(indptr[:-1], indptr[1:])
+        ]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Expand to the DataFrame layout of analyze_file records."""
+        columns = {
+            "student_name": self.student_names,
+            "unsolved_assessment_count": self.unsolved_counts(),
+            "unsolved_titles": np.array(self._joined_titles(), dtype=object),
+            "solve_pct": self.solve_pct,
+        }
+        for name in DIMENSIONS:
+            columns[name] = np.asarray(self.dimensions[name], dtype=object)
+        for name in COUNTS:
+            columns[name] = self.counts[name].astype(np.int64)
+        return pd.DataFrame({name: columns[name] for name in RECORD_COLUMNS})
+
+    def to_records(self) -> List[Dict]:
+        """Expand to the list-of-dicts layout returned by analyze_file."""
+        columns = {
+            "student_name": self.student_names.tolist(),
+            "unsolved_assessment_count": self.unsolved_counts().tolist(),
+            "unsolved_titles": self._joined_titles(),
+            "solve_pct": self.solve_pct.tolist(),
+        }
+        for name in DIMENSIONS:
+            columns[name] = np.asarray(self.dimensions[name], dtype=object).tolist()
+        for name in COUNTS:
+            columns[name] = self.counts[name].tolist()
+
+        names = list(RECORD_COLUMNS)
+        return [dict(zip(names, values)) for values in zip(*(columns[name] for name in names))]
@@ -0,0 +1,100 @@
+from datetime import datetime, date
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .dates import date_range_mask
+from .results import StudentResults
+
+# Cell status codes stored in SheetMatrix.status
+STATUS_IGNORED = 0  # I, AB, X, dashes or empty
+STATUS_SOLVED = 1
+STATUS_MISSING = 2  # M
+
+
+class SheetMatrix:
+    """Per-cell status of one sheet: students × assessment columns."""
+
+    def __init__(
+        self,
+        sheet_name: str,
+        sheet_info: Tuple[str, str, str],
+        student_names: List[str],
+        titles: List[str],
+        due_dates: np.ndarray,
+        status: np.ndarray
+    ):
+        """
+        Args:
+            sheet_name: Original sheet name
+            sheet_info: (subject, level, section) parsed from the sheet name
+            student_names: Names of the student rows (header/total rows removed)
+            titles: Assessment names, one per column
+            due_dates: Due date (or None) per column
+            status: int8 matrix of STATUS_* codes, shape (students, columns)
+        """
+        self.sheet_name = sheet_name
+        self.sheet_info = sheet_info
+        self.student_names = student_names
+        self.titles = np.array(titles, dtype=object)
+        self.due_dates = due_dates
+        self.status = status
+
+
+class AnalyzedWorkbook:
+    """
+    Analyzed workbook that can be re-scored for any date range.
+
+    Holds the cell status matrix and column due dates of every sheet, so
+    changing the date window only recomputes student metrics from column
+    masks; the workbook is never parsed again.
+    """
+
+    def __init__(self, analyzer, sheets: List[SheetMatrix]):
+        """
+        Args:
+            analyzer: AssessmentAnalyzer used for scoring
+            sheets: Status matrices in sheet order
+        """
+        self.analyzer = analyzer
+        self.sheets = sheets
+
+    def due_date_bounds(self) -> Tuple[Optional[date], Optional[date]]:
+        """Earliest and latest due date across all sheets."""
+        dates = [d for sheet in self.sheets for d in sheet.due_dates if d is not None]
+        if not dates:
+            return None, None
+        return min(dates), max(dates)
+
+    def records(
+        self,
+        date_range: Optional[Tuple[Union[date, datetime], Union[date, datetime]]] = None
+    ) -> List[Dict]:
+        """
+        Student records for assessments due within date_range.
+
+        Gives the same records as AssessmentAnalyzer(date_range=...).analyze_file
+        on the original workbook, without its per-sheet warnings.
+        """
+        results = []
+        for sheet in self.sheets:
+            column_mask = date_range_mask(sheet.due_dates, date_range)
+            if not column_mask.any():
+                continue
+            results.extend(self.analyzer.score_matrix(sheet, column_mask))
+        return results
+
+    def results(
+        self,
+        date_range: Optional[Tuple[Union[date, datetime], Union[date, datetime]]] = None
+    ) -> StudentResults:
+        """Same students as records(date_range), as a compact StudentResults container."""
+        parts = []
+        for sheet in self.sheets:
+            column_mask = date_range_mask(sheet.due_dates, date_range)
+            if not column_mask.any():
+                continue
+            part = self.analyzer.score_matrix_compact(sheet, column_mask)
+            if len(part):
+                parts.append(part)
+        return StudentResults.concat(parts)
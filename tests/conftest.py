@@ -0,0 +1,133 @@
+"""
+Shared fixtures.
+
+smtp_server is a local SMTP stand-in: it speaks enough of the protocol for
+smtplib, records every connection and delivered message, and can be scripted
+to refuse messages for a recipient.
+"""
+
+import socketserver
+import threading
+import time
+from typing import Dict, List
+
+import pytest
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode("ascii"))
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+            connection = server.connections
+        mail_from = None
+        recipients: List[str] = []
+
+        self._reply("220 localhost SMTP stand-in")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command, _, argument = line.decode("ascii", "replace").strip().partition(" ")
+            command = command.upper()
+
+            if command == "EHLO":
+                self._reply("250-localhost")
+                self._reply("250 8BITMIME")
+            elif command == "HELO":
+                self._reply("250 localhost")
+            elif command == "MAIL":
+                mail_from = argument.partition(":")[2].strip(" <>")
+                recipients = []
+                self._reply("250 OK")
+            elif command == "RCPT":
+                recipients.append(argument.partition(":")[2].strip(" <>"))
+                self._reply("250 OK")
+            elif command == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                for data_line in iter(self.rfile.readline, b""):
+                    if data_line == b".\r\n":
+                        break
+                    data.append(data_line)
+                reply = server.next_reply(recipients[0] if recipients else "")
+                if reply.startswith("250"):
+                    with server.lock:
+                        server.messages.append({
+                            "from": mail_from,
+                            "to": list(recipients),
+                            "data": b"".join(data),
+                            "time": time.monotonic(),
+                            "connection": connection,
+                        })
+                self._reply(reply)
+            elif command in ("RSET", "NOOP"):
+                recipients = []
+                self._reply("250 OK")
+            elif command == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """
+    Threaded SMTP server on a free local port.
+
+    replies maps a recipient to the replies its DATA commands get, in order;
+    the last reply repeats, and recipients without an entry are accepted.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages: List[Dict] = []
+        self.replies: Dict[str, List[str]] = {}
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def next_reply(self, recipient: str) -> str:
+        with self.lock:
+            replies = self.replies.get(recipient)
+            if not replies:
+                return "250 OK"
+            return replies.pop(0) if len(replies) > 1 else replies[0]
+
+    def delivered_to(self, recipient: str) -> int:
+        with self.lock:
+            return sum(recipient in message["to"] for message in self.messages)
+
+
+@pytest.fixture
+def smtp_server():
+    server = SMTPStandIn()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def make_report(teacher_email: str, section: str = "1") -> Dict:
+    """Arguments of EmailSender.send_subject_report for one section."""
+    return {
+        "teacher_email": teacher_email,
+        "subject": "الرياضيات",
+        "level": "03",
+        "section": section,
+        "report_content": "تقرير المادة",
+        "inactive_students": [{"student_name": "طالب 1", "solve_pct": 10.0}],
+        "critical_students": [],
+    }
@@ -0,0 +1,86 @@
+import pickle
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from benchmarks.workbooks import make_analyzer_workbook
+from src.analyzer import AssessmentAnalyzer
+from src.cache import ResultCache
+from src.diagnostics import CallbackDiagnostics
+
+EMPTY_SHEET = "العلوم 01 99"
+
+
+@pytest.fixture(scope="module")
+def workbook(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("workbooks") / "analyzer.xlsx")
+    make_analyzer_workbook(path, sheets=4, students=12, assessments=10)
+    # A sheet without assessment titles, which the analyzer warns about
+    wb = load_workbook(path)
+    ws = wb.create_sheet(EMPTY_SHEET)
+    for row in range(5, 10):
+        ws.cell(row=row, column=1, value=f"طالب {row}")
+    wb.save(path)
+    return path
+
+
+def test_analyzer_with_callback_sink_pickles():
+    analyzer = AssessmentAnalyzer(diagnostics=CallbackDiagnostics(lambda level, message: None))
+
+    restored = pickle.loads(pickle.dumps(analyzer))
+
+    assert restored.cache_settings() == analyzer.cache_settings()
+
+
+def test_parallel_analysis_reports_to_callback_sink(workbook):
+    sheets = load_workbook(workbook, read_only=True).sheetnames
+    serial_messages, parallel_messages = [], []
+
+    serial = AssessmentAnalyzer(
+        diagnostics=CallbackDiagnostics(lambda level, message: serial_messages.append((level, message)))
+    ).analyze_file(workbook, sheets)
+    parallel = AssessmentAnalyzer(
+        diagnostics=CallbackDiagnostics(lambda level, message: parallel_messages.append((level, message)))
+    ).analyze_file(workbook, sheets, workers=2)
+
+    assert parallel == serial
+    assert len(parallel) > 0
+    assert parallel_messages == serial_messages
+    assert [level for level, _ in parallel_messages] == ["warning"]
+    assert EMPTY_SHEET in parallel_messages[0][1]
+
+
+def test_streaming_skips_rows_above_names_row(tmp_path):
+    path = str(tmp_path / "row_four.xlsx")
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "الرياضيات 01 1"
+    ws["H1"], ws["I1"] = "تقييم 1", "تقييم 2"
+    # Row 4 lies between the due-date row and the first student row
+    ws["A4"], ws["H4"], ws["I4"] = "Row four note", 1, "M"
+    ws["A5"], ws["H5"], ws["I5"] = "Ali", 1, "M"
+    wb.save(path)
+
+    analyzer = AssessmentAnalyzer()
+    loaded = analyzer.analyze_file(path, [ws.title])
+    streamed = analyzer.analyze_file(path, [ws.title], streaming=True)
+
+    assert [record["student_name"] for record in loaded] == ["Ali"]
+    assert streamed == loaded
+
+
+def test_workbook_cache_hit_replays_warnings(workbook, tmp_path):
+    sheets = load_workbook(workbook, read_only=True).sheetnames
+    cache = ResultCache(str(tmp_path / "cache"))
+    runs = []
+    for _ in range(2):
+        messages = []
+        analyzer = AssessmentAnalyzer(
+            diagnostics=CallbackDiagnostics(lambda level, message: messages.append((level, message)))
+        )
+        runs.append((analyzer.analyze_file(workbook, sheets, cache=cache), messages))
+
+    (first, first_messages), (second, second_messages) = runs
+    assert second == first
+    assert [level for level, _ in first_messages] == ["warning"]
+    assert second_messages == first_messages
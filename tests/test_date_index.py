@@ -0,0 +1,53 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from src.date_index import DueDateIndex
+
+DUE_DATES = {
+    "A - q": date(2025, 9, 1),
+    "A - r": date(2025, 9, 8),
+    "B - s": date(2025, 9, 15),
+    "B - t": None,
+}
+
+
+def make_values() -> pd.DataFrame:
+    return pd.DataFrame(
+        [[5, 10, 20, 30, 99], [np.nan, 4, "x", 6, 99]],
+        columns=["A - q", "A - q", "A - r", "B - s", "B - t"],
+    )
+
+
+def test_window_matches_column_selection():
+    values = make_values()
+    index = DueDateIndex(DUE_DATES, values)
+
+    windows = [
+        (date(2025, 9, 1), date(2025, 9, 30)),
+        (date(2025, 9, 1), date(2025, 9, 1)),
+        (date(2025, 9, 2), date(2025, 9, 14)),
+    ]
+    for start, end in windows:
+        columns = index.columns(start, end)
+        expected = values[columns].apply(pd.to_numeric, errors="coerce").mean(axis=1)
+        pd.testing.assert_series_equal(index.window_mean(start, end), expected, check_names=False)
+
+
+def test_repeated_title_counts_every_column():
+    index = DueDateIndex(DUE_DATES, make_values())
+    start, end = date(2025, 9, 1), date(2025, 9, 1)
+
+    assert index.columns(start, end) == ["A - q"]
+    assert index.window_sum(start, end).tolist() == [15, 4]
+    assert index.window_count(start, end).tolist() == [2, 1]
+    # A later window is not shifted by the repeated column
+    assert index.window_sum(date(2025, 9, 8), date(2025, 9, 8)).tolist() == [20, 0]
+
+
+def test_undated_columns_are_not_indexed():
+    index = DueDateIndex(DUE_DATES, make_values())
+
+    assert index.columns(date(2025, 1, 1), date(2026, 1, 1)) == ["A - q", "A - r", "B - s"]
+    assert len(index.labels) == len(index.dates) == 4
@@ -0,0 +1,81 @@
+import socket
+import time
+
+from src.email_reports import EmailSender
+
+from .conftest import make_report
+
+
+def make_sender(smtp_server) -> EmailSender:
+    return EmailSender("127.0.0.1", smtp_server.port, "school@example.com", "", use_tls=False, timeout=5)
+
+
+def test_single_report_opens_one_connection_per_message(smtp_server):
+    sender = make_sender(smtp_server)
+    for section in range(3):
+        success, _ = sender.send_subject_report(**make_report("teacher@example.com", str(section)))
+        assert success
+
+    assert len(smtp_server.messages) == 3
+    assert smtp_server.connections == 3
+
+
+def test_batch_reuses_one_connection_per_worker(smtp_server):
+    reports = [make_report(f"teacher{i}@example.com", str(i)) for i in range(20)]
+
+    results = make_sender(smtp_server).send_reports_batch(reports, max_workers=2)
+
+    assert all(result["success"] for result in results)
+    assert [result["teacher_email"] for result in results] == [report["teacher_email"] for report in reports]
+    assert len(smtp_server.messages) == 20
+    assert 1 <= smtp_server.connections <= 2
+
+
+def test_batch_renews_connection_after_max_messages(smtp_server):
+    reports = [make_report(f"teacher{i}@example.com", str(i)) for i in range(7)]
+
+    results = make_sender(smtp_server).send_reports_batch(reports, max_workers=1, max_messages_per_connection=3)
+
+    assert all(result["success"] for result in results)
+    assert len(smtp_server.messages) == 7
+    assert smtp_server.connections == 3
+    per_connection = [message["connection"] for message in smtp_server.messages]
+    assert [per_connection.count(connection) for connection in sorted(set(per_connection))] == [3, 3, 1]
+
+
+def test_batch_refused_recipient_keeps_connection(smtp_server):
+    smtp_server.replies["bad@example.com"] = ["550 No such user"]
+    reports = [make_report(email) for email in ["a@example.com", "bad@example.com", "b@example.com"]]
+
+    results = make_sender(smtp_server).send_reports_batch(reports, max_workers=1)
+
+    assert [result["success"] for result in results] == [True, False, True]
+    assert "550" in results[1]["message"]
+    assert smtp_server.connections == 1
+
+
+def test_batch_rate_limit_spaces_messages(smtp_server):
+    reports = [make_report(f"teacher{i}@example.com", str(i)) for i in range(6)]
+    # 600 per minute: one message every 0.1s
+    started = time.monotonic()
+    results = make_sender(smtp_server).send_reports_batch(reports, max_workers=3, max_per_minute=600)
+    elapsed = time.monotonic() - started
+
+    assert all(result["success"] for result in results)
+    assert elapsed >= 0.5
+    times = sorted(message["time"] for message in smtp_server.messages)
+    assert times[-1] - times[0] >= 0.45
+    assert smtp_server.connections <= 3
+
+
+def test_batch_unreachable_server_reports_failures():
+    # Bind and close a socket to get a port nothing listens on
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    sender = EmailSender("127.0.0.1", port, "school@example.com", "", use_tls=False, timeout=2)
+
+    results = sender.send_reports_batch([make_report("a@example.com"), make_report("b@example.com")])
+
+    assert [result["success"] for result in results] == [False, False]
+    assert all(result["message"].startswith("خطأ في الإرسال") for result in results)
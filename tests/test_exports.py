@@ -0,0 +1,71 @@
+import gc
+import zipfile
+
+import pandas as pd
+
+from src.exports import start_report_zip_export
+
+
+def make_results(students: int) -> pd.DataFrame:
+    return pd.DataFrame([
+        {
+            "student_name": f"طالب {i}",
+            "subject": "الرياضيات",
+            "class": "01",
+            "section": "1",
+            "total_material_solved": 1,
+            "total_assessments": 2,
+            "remaining": 1,
+            "unsolved_assessment_count": 1,
+            "unsolved_titles": "تقييم 2",
+            "solve_pct": 50.0,
+            "category": "تحتاج إلى تحسين",
+            "recommendation": "اجتهد أكثر، هناك فرصة للوصول إلى الفئة البلاتينية",
+        }
+        for i in range(students)
+    ])
+
+
+def test_export_writes_one_page_per_student(tmp_path):
+    export = start_report_zip_export(make_results(3), directory=str(tmp_path))
+    assert export.wait(timeout=30)
+
+    assert export.succeeded
+    assert export.progress == 1.0
+    with export.open() as archive, zipfile.ZipFile(archive) as zf:
+        pages = [name for name in zf.namelist() if name.endswith(".html")]
+    assert len(pages) == 3
+    export.cleanup()
+
+
+def test_export_of_empty_results_is_empty_archive(tmp_path):
+    export = start_report_zip_export(pd.DataFrame(), directory=str(tmp_path))
+    assert export.wait(timeout=30)
+
+    assert export.succeeded
+    assert export.progress == 1.0
+    with export.open() as archive, zipfile.ZipFile(archive) as zf:
+        assert zf.namelist() == []
+    export.cleanup()
+
+
+def test_cleanup_of_running_export_deletes_archive(tmp_path):
+    export = start_report_zip_export(make_results(2000), directory=str(tmp_path))
+
+    export.cleanup()
+    assert export.wait(timeout=30)
+
+    assert not export.succeeded
+    assert export.completed < export.total
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_unreferenced_export_deletes_archive(tmp_path):
+    export = start_report_zip_export(make_results(3), directory=str(tmp_path))
+    assert export.wait(timeout=30)
+    assert len(list(tmp_path.iterdir())) == 1
+
+    del export
+    gc.collect()
+
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,34 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous bound for slow machines; pandas and numpy take most of it
+MAX_IMPORT_SECONDS = 3.0
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import src.analyzer
+seconds = time.perf_counter() - started
+print(json.dumps({"seconds": seconds, "modules": sorted(sys.modules)}))
+"""
+
+
+def import_analyzer_in_fresh_process() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=ROOT, capture_output=True, text=True, check=True, timeout=60
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_importing_analyzer_stays_light():
+    probe = import_analyzer_in_fresh_process()
+
+    assert "streamlit" not in probe["modules"]
+    for module in ("src.cache", "src.parallel", "src.html_reports", "concurrent.futures.process"):
+        assert module not in probe["modules"], module
+    assert probe["seconds"] < MAX_IMPORT_SECONDS
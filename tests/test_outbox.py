@@ -0,0 +1,117 @@
+import time
+
+import pytest
+
+from src.email_reports import EmailSender
+from src.outbox import STATUS_FAILED, STATUS_PENDING, STATUS_SENT, EmailOutbox
+
+from .conftest import make_report
+
+
+@pytest.fixture
+def outbox(smtp_server, tmp_path):
+    sender = EmailSender("127.0.0.1", smtp_server.port, "school@example.com", "", use_tls=False, timeout=5)
+    return EmailOutbox(sender, str(tmp_path / "outbox.sqlite3"), max_attempts=3, base_delay=0.05, max_delay=0.15)
+
+
+def process_until_settled(outbox: EmailOutbox, timeout: float = 5):
+    """Run delivery rounds until nothing is pending."""
+    deadline = time.monotonic() + timeout
+    while outbox.summary()[STATUS_PENDING] and time.monotonic() < deadline:
+        if not outbox.process_once():
+            time.sleep(0.01)
+
+
+def test_enqueue_same_report_twice_sends_once(outbox, smtp_server):
+    report = make_report("teacher@example.com")
+
+    first = outbox.enqueue(report)
+    second = outbox.enqueue(dict(report))
+    assert first == second
+    assert outbox.summary()[STATUS_PENDING] == 1
+
+    assert outbox.process_once() == 1
+    # Enqueuing a sent report again is a no-op as well
+    outbox.enqueue(report)
+    assert outbox.process_once() == 0
+
+    assert smtp_server.delivered_to("teacher@example.com") == 1
+    assert outbox.status(first)["status"] == STATUS_SENT
+
+
+def test_enqueue_many_with_explicit_keys(outbox, smtp_server):
+    reports = [make_report("a@example.com"), make_report("b@example.com")]
+
+    keys = outbox.enqueue_many(reports, ["week-1-a", "week-1-b"])
+    outbox.enqueue_many(reports, ["week-1-a", "week-1-b"])
+    process_until_settled(outbox)
+
+    assert keys == ["week-1-a", "week-1-b"]
+    assert outbox.summary()[STATUS_SENT] == 2
+    assert len(smtp_server.messages) == 2
+
+
+def test_retry_delay_doubles_up_to_max_delay(outbox):
+    assert [outbox.retry_delay(attempts) for attempts in range(1, 5)] == [0.05, 0.1, 0.15, 0.15]
+
+
+def test_transient_failure_is_retried_after_backoff(outbox, smtp_server):
+    smtp_server.replies["flaky@example.com"] = ["451 Try again later", "250 OK"]
+    key = outbox.enqueue(make_report("flaky@example.com"))
+
+    assert outbox.process_once() == 1
+    state = outbox.status(key)
+    assert state["status"] == STATUS_PENDING
+    assert state["attempts"] == 1
+    assert "451" in state["last_error"]
+    assert state["next_attempt_at"] - state["updated_at"] == pytest.approx(outbox.retry_delay(1))
+    # Not due again until the backoff has passed
+    assert outbox.process_once() == 0
+
+    process_until_settled(outbox)
+
+    state = outbox.status(key)
+    assert state["status"] == STATUS_SENT
+    assert state["attempts"] == 2
+    assert state["sent_at"] is not None
+    assert smtp_server.delivered_to("flaky@example.com") == 1
+
+
+def test_permanent_failure_ends_failed_after_max_attempts(outbox, smtp_server):
+    smtp_server.replies["bad@example.com"] = ["550 No such user"]
+    bad = outbox.enqueue(make_report("bad@example.com"))
+    good = outbox.enqueue(make_report("good@example.com"))
+
+    process_until_settled(outbox)
+
+    state = outbox.status(bad)
+    assert state["status"] == STATUS_FAILED
+    assert state["attempts"] == outbox.max_attempts
+    assert "550" in state["last_error"]
+    assert outbox.status(good)["status"] == STATUS_SENT
+    assert outbox.summary() == {"pending": 0, "sending": 0, "sent": 1, "failed": 1}
+    assert smtp_server.delivered_to("bad@example.com") == 0
+
+    # Once the recipient is fixed, failed messages can be queued again
+    smtp_server.replies.clear()
+    assert outbox.retry_failed() == 1
+    assert outbox.status(bad)["attempts"] == 0
+    process_until_settled(outbox)
+    assert outbox.status(bad)["status"] == STATUS_SENT
+
+
+def test_background_worker_drains_outbox(outbox, smtp_server):
+    outbox.poll_interval = 0.05
+    keys = outbox.enqueue_many([make_report(f"teacher{i}@example.com", str(i)) for i in range(5)])
+
+    outbox.start()
+    try:
+        deadline = time.monotonic() + 5
+        while outbox.summary()[STATUS_SENT] < 5 and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        outbox.stop(timeout=5)
+
+    assert not outbox.running
+    assert [outbox.status(key)["status"] for key in keys] == [STATUS_SENT] * 5
+    assert len(smtp_server.messages) == 5